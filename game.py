@@ -274,6 +274,192 @@ class Grid:
                 bools.append(False)
         return bools
 
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:
+    _popcount = lambda n: bin(n).count('1')
+
+class BitGrid(Grid):
+    """
+    A Grid of booleans packed into a single arbitrary-precision int, in which
+    cell (x,y) is bit number x * height + y.  Data is read and written with
+    the same grid[x][y] syntax as a Grid.
+
+    Since ints are immutable, copy is O(1) and copies never share state;
+    hash and equality are those of one int, count is a popcount and setting
+    or clearing a cell flips a single bit with an XOR.  This makes BitGrids
+    cheap to copy and hash as part of search states, as the food grids of
+    FoodSearchProblem are.
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def __getitem__(self, i):
+        if i < 0: i += self.width
+        if not 0 <= i < self.width: raise IndexError('BitGrid column out of range')
+        return _BitGridColumn(self, i * self.height)
+
+    def __setitem__(self, key, item):
+        column = self[key]
+        for y, value in enumerate(item):
+            column[y] = value
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield _BitGridColumn(self, x * self.height)
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if not isinstance(other, BitGrid):
+            return self.width == other.width and self.height == other.height and \
+                   self.asList() == other.asList()
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
+
+    def __hash__(self):
+        # Same value as Grid.__hash__, which builds this int one cell at a time
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid.__new__(BitGrid)
+        g.CELLS_PER_INT = self.CELLS_PER_INT
+        g.width = self.width
+        g.height = self.height
+        g.bits = self.bits
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        ones = _popcount(self.bits)
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key = True):
+        bits = self.bits
+        if not key:
+            bits ^= (1 << (self.width * self.height)) - 1
+        list = []
+        height = self.height
+        while bits:
+            lowest = bits & -bits
+            index = lowest.bit_length() - 1
+            list.append( (index // height, index % height) )
+            bits ^= lowest
+        return list
+
+    def toGrid(self):
+        "Returns a list-backed Grid with the same contents"
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+    def fromGrid(grid):
+        "Returns a BitGrid with the same contents as any Grid"
+        g = BitGrid(grid.width, grid.height)
+        bits = 0
+        for x, y in grid.asList():
+            bits |= 1 << (x * grid.height + y)
+        g.bits = bits
+        return g
+    fromGrid = staticmethod(fromGrid)
+
+class _BitGridColumn:
+    "The column grid[x] of a BitGrid, so that grid[x][y] reads and writes one bit."
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, offset):
+        self.grid = grid
+        self.offset = offset
+
+    def __getitem__(self, y):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('BitGrid row out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('BitGrid row out of range')
+        bit = 1 << (self.offset + y)
+        if bool(self.grid.bits & bit) != bool(value):
+            self.grid.bits ^= bit
+
+    def __len__(self):
+        return self.grid.height
+
+    def __iter__(self):
+        bits = self.grid.bits >> self.offset
+        for y in range(self.grid.height):
+            yield (bits >> y) & 1 == 1
+
+class FrozenGrid(Grid):
+    """
+    A read-only Grid backed by a tuple of tuples, so that grid[x][y] = value
+    and grid[x] = column raise TypeError.  copy and deepCopy return an
+    ordinary Grid that can be written to.
+    """
+    def __init__(self, grid):
+        self.CELLS_PER_INT = 30
+        self.width = grid.width
+        self.height = grid.height
+        self.data = tuple(tuple(grid[x]) for x in range(grid.width))
+
+    def __setitem__(self, key, item):
+        raise TypeError('FrozenGrid is read-only')
+
+    def __eq__(self, other):
+        if other == None: return False
+        return self.width == other.width and self.height == other.height and \
+               self.asList() == other.asList()
+
+    __hash__ = Grid.__hash__
+
+    def copy(self):
+        g = Grid(self.width, self.height)
+        g.data = [list(x) for x in self.data]
+        return g
+
+    def shallowCopy(self):
+        return self
+
+class FrozenBitGrid(BitGrid):
+    """
+    A read-only BitGrid: writing a cell raises TypeError.  copy and deepCopy
+    return an ordinary BitGrid, still in O(1).
+    """
+    def __init__(self, grid):
+        if not isinstance(grid, BitGrid):
+            grid = BitGrid.fromGrid(grid)
+        vars(self).update(CELLS_PER_INT=grid.CELLS_PER_INT, width=grid.width, height=grid.height, bits=grid.bits)
+
+    def __setattr__(self, name, value):
+        raise TypeError('FrozenBitGrid is read-only')
+
+    def shallowCopy(self):
+        return self
+
+def freezeGrid(grid):
+    "Returns a read-only copy of a Grid or BitGrid, of the same kind."
+    if isinstance(grid, BitGrid):
+        return FrozenBitGrid(grid)
+    return FrozenGrid(grid)
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
@@ -395,7 +581,7 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
+        state.layout = self.layout.deepCopy() # Shared; see Layout.deepCopy
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -490,7 +676,7 @@ class GameStateData:
         """
         self.food = layout.food.copy()
         #self.capsules = []
-        self.capsules = layout.capsules[:]
+        self.capsules = list(layout.capsules)
         self.layout = layout
         self.score = 0
         self.scoreChange = 0
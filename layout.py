@@ -13,23 +13,38 @@
 
 
 from util import manhattanDistance
-from game import Grid
+from game import Grid, BitGrid, freezeGrid
 import os
 import random
 from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
+LAYOUT_CACHE = {}
 
 class Layout:
     """
     A Layout manages the static information about the game board.
+
+    Layouts are immutable once built: attributes cannot be rebound, the
+    wall and food grids are frozen (see game.freezeGrid) and capsules and
+    agentPositions are tuples.  Game states therefore share one Layout
+    instead of copying it, and deepCopy returns the layout itself; a game
+    state copies the food and capsules it changes.  internLayout returns the
+    single shared Layout for a given layout text.
+
+    The food is stored in a BitGrid, which every game state and food search
+    state copies and hashes.  The walls are only ever read, so they stay in a
+    list-backed Grid, which is faster to index.  Either class can be swapped
+    by overriding FOOD_GRID or WALL_GRID.
     """
+    FOOD_GRID = BitGrid
+    WALL_GRID = Grid
 
     def __init__(self, layoutText):
         self.width = len(layoutText[0])
         self.height= len(layoutText)
-        self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.walls = self.WALL_GRID(self.width, self.height, False)
+        self.food = self.FOOD_GRID(self.width, self.height, False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
@@ -37,6 +52,16 @@ class Layout:
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
         # self.initializeVisibilityMatrix()
+        self.walls = freezeGrid(self.walls)
+        self.food = freezeGrid(self.food)
+        self.capsules = tuple(self.capsules)
+        self.agentPositions = tuple(self.agentPositions)
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError('Layouts are immutable; cannot set ' + name)
+        object.__setattr__(self, name, value)
 
     def getNumGhosts(self):
         return self.numGhosts
@@ -57,10 +82,10 @@ class Layout:
                             while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)] :
                                 vis[x][y][direction].add((nextx, nexty))
                                 nextx, nexty = x + dx, y + dy
-            self.visibility = vis
+            object.__setattr__(self, 'visibility', vis)
             VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
         else:
-            self.visibility = VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)]
+            object.__setattr__(self, 'visibility', VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)])
 
     def isWall(self, pos):
         x, col = pos
@@ -91,7 +116,8 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        # Layouts are immutable, so every copy can share this one
+        return self
 
     def processLayoutText(self, layoutText):
         """
@@ -129,6 +155,17 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
+
+def internLayout(layoutText):
+    """
+    Returns the shared Layout for a layout text (a list of lines), parsing the
+    text only the first time it is seen.
+    """
+    key = tuple(layoutText)
+    if key not in LAYOUT_CACHE:
+        LAYOUT_CACHE[key] = Layout(list(layoutText))
+    return LAYOUT_CACHE[key]
+
 def getLayout(name, back = 2):
     if name.endswith('.lay'):
         layout = tryToLoad('layouts/' + name)
@@ -146,5 +183,5 @@ def getLayout(name, back = 2):
 def tryToLoad(fullname):
     if(not os.path.exists(fullname)): return None
     f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    try: return internLayout([line.strip() for line in f])
     finally: f.close()
@@ -0,0 +1,532 @@
+# mazeDistances.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Maze distance engines that work directly on the walls Grid of a layout, for
+agents and heuristics that need many maze distances rather than one search.
+"""
+
+import array
+import collections
+import hashlib
+import heapq
+import mmap
+import os
+import weakref
+from game import Directions
+
+# Where DistanceOracle keeps its tables, one file per walls layout
+DISTANCE_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mazeDistances')
+
+# The order in which neighbours are generated, as in PositionSearchProblem
+MOVES = [(Directions.NORTH, (0, 1)),
+         (Directions.SOUTH, (0, -1)),
+         (Directions.EAST, (1, 0)),
+         (Directions.WEST, (-1, 0))]
+
+class MazeGraph:
+    """
+    The open cells of a walls Grid as an unweighted graph.  Cell (x,y) has
+    index x * height + y, and neighbours[index] lists the (action, index)
+    pairs of the open cells next to it, in MOVES order.  Wall cells have no
+    neighbours.  openCells lists the open cells and openIndex maps an index
+    to the position of its cell in openCells, or -1 for walls.
+
+    Building the graph reads every cell of the Grid once; use getMazeGraph to
+    share one graph between everything that works on the same walls.
+    """
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.width = walls.width
+        self.height = walls.height
+        self.size = self.width * self.height
+        self.neighbours = [()] * self.size
+        self.openCells = walls.asList(False)
+        self.openIndex = [-1] * self.size # index -> position in openCells
+        for position, (x, y) in enumerate(self.openCells):
+            self.openIndex[x * self.height + y] = position
+            adjacent = []
+            for action, (dx, dy) in MOVES:
+                nextx, nexty = x + dx, y + dy
+                if 0 <= nextx < self.width and 0 <= nexty < self.height and not walls[nextx][nexty]:
+                    adjacent.append((action, nextx * self.height + nexty))
+            self.neighbours[x * self.height + y] = tuple(adjacent)
+
+    def index(self, cell):
+        return cell[0] * self.height + cell[1]
+
+    def cell(self, index):
+        return divmod(index, self.height)
+
+_MAZE_GRAPHS = weakref.WeakKeyDictionary()
+
+def getMazeGraph(walls):
+    "Returns the MazeGraph of a walls Grid, building it only once per Grid."
+    graph = _MAZE_GRAPHS.get(walls)
+    if graph == None or graph.walls is not walls:
+        graph = MazeGraph(walls)
+        _MAZE_GRAPHS[walls] = graph
+    return graph
+
+class DistanceField:
+    """
+    Maze distances from a set of source cells to every reachable open cell,
+    computed with a single breadth first flood over the walls Grid.
+
+    With a single source, such as Pacman's position, the field gives the
+    distance and the first move towards every cell.  With many sources, such
+    as every food pellet, it gives for every cell the distance to the closest
+    source and the path that leads there, so that a closest-dot agent can read
+    its next path straight out of the field.
+
+    Sources can be removed (for instance when a pellet is eaten) with
+    removeSource, which repairs only the cells whose closest source it was.
+    """
+
+    def __init__(self, walls, sources):
+        self.walls = walls
+        self.graph = getMazeGraph(walls)
+        size = self.graph.size
+        self.sources = set()
+        self.distances = [-1] * size   # steps from the closest source
+        self.parents = [-1] * size     # previous cell on that path
+        self.actions = [None] * size   # action from the previous cell
+        self.origins = [-1] * size     # the closest source
+        self.firstMoves = [None] * size
+        self.regions = {}              # source -> cells it is the closest source of
+        frontier = []
+        for source in sources:
+            index = self.graph.index(source)
+            if self.distances[index] == 0: continue
+            self.sources.add(source)
+            self.distances[index] = 0
+            self.origins[index] = index
+            self.regions[index] = [index]
+            frontier.append(index)
+        self._flood(frontier)
+
+    def _flood(self, frontier):
+        """
+        Breadth first flood outwards from cells whose distances are already
+        set.  The frontier must be sorted by distance; its cells are merged
+        into the queue in distance order, so that seeds further out do not
+        jump ahead of cells reached from closer ones.
+        """
+        distances, parents, actions = self.distances, self.parents, self.actions
+        origins, firstMoves, regions = self.origins, self.firstMoves, self.regions
+        neighbours = self.graph.neighbours
+        pending = collections.deque(frontier)
+        queue = collections.deque()
+        while queue or pending:
+            if pending and (not queue or distances[pending[0]] <= distances[queue[0]]):
+                index = pending.popleft()
+            else:
+                index = queue.popleft()
+            distance = distances[index] + 1
+            origin = origins[index]
+            firstMove = firstMoves[index]
+            for action, nextIndex in neighbours[index]:
+                if distances[nextIndex] != -1: continue
+                distances[nextIndex] = distance
+                parents[nextIndex] = index
+                actions[nextIndex] = action
+                origins[nextIndex] = origin
+                firstMoves[nextIndex] = firstMove if firstMove != None else action
+                regions[origin].append(nextIndex)
+                queue.append(nextIndex)
+
+    def removeSource(self, source):
+        """
+        Removes a source and recomputes the cells that were closest to it.
+        Distances elsewhere cannot change, since removing a source only ever
+        makes cells further from their closest source.
+        """
+        self.sources.discard(source)
+        orphans = self.regions.pop(self.graph.index(source), [])
+        distances, neighbours = self.distances, self.graph.neighbours
+        for index in orphans:
+            distances[index] = -1
+            self.origins[index] = -1
+            self.parents[index] = -1
+            self.actions[index] = None
+            self.firstMoves[index] = None
+
+        # The region is refilled from the cells that border it, which sit at
+        # different distances, so the flood starts from them in distance order
+        seeds = set()
+        for index in orphans:
+            for action, nextIndex in neighbours[index]:
+                if distances[nextIndex] != -1: seeds.add(nextIndex)
+        self._flood(sorted(seeds, key=distances.__getitem__))
+
+    def getDistance(self, cell):
+        "Returns the maze distance from the closest source, or None if unreachable"
+        distance = self.distances[self.graph.index(cell)]
+        if distance == -1: return None
+        return distance
+
+    def getSource(self, cell):
+        "Returns the source closest to a cell, or None if unreachable"
+        origin = self.origins[self.graph.index(cell)]
+        if origin == -1: return None
+        return self.graph.cell(origin)
+
+    def getFirstMove(self, cell):
+        "Returns the first action on a shortest path from the closest source to a cell"
+        return self.firstMoves[self.graph.index(cell)]
+
+    def getPathTo(self, cell):
+        "Returns the actions that lead from the closest source to a cell"
+        path = self.getPathFrom(cell)
+        path.reverse()
+        return [Directions.REVERSE[action] for action in path]
+
+    def getPathFrom(self, cell):
+        "Returns the actions that lead from a cell to its closest source"
+        path = []
+        index = self.graph.index(cell)
+        parents, actions = self.parents, self.actions
+        while parents[index] != -1:
+            path.append(Directions.REVERSE[actions[index]])
+            index = parents[index]
+        return path
+
+    def closest(self, cells):
+        "Returns the reachable cell among cells that is closest to a source, or None"
+        reachable = [cell for cell in cells if self.getDistance(cell) != None]
+        if len(reachable) == 0: return None
+        return min(reachable, key=self.getDistance)
+
+def wallsHash(walls):
+    "Returns a hex digest that identifies a walls Grid, for naming cache files."
+    text = '%d %d\n%s' % (walls.width, walls.height, str(walls))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+def _saveTable(path, table):
+    "Writes an array of unsigned 16-bit ints to a cache file, if the cache directory can be written."
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, 'wb') as f:
+            table.tofile(f)
+        # Atomic, so that concurrent processes never map a partial table
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary): os.remove(temporary)
+
+def _mapTable(path, length):
+    "Memory-maps a cache file of length unsigned 16-bit ints, or returns None if there is none."
+    expected = length * array.array('H').itemsize
+    if expected == 0 or not os.path.exists(path) or os.path.getsize(path) != expected:
+        return None
+    with open(path, 'rb') as f:
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(table).cast('H')
+
+class DistanceOracle:
+    """
+    All-pairs maze distances between the open cells of a walls Grid.
+
+    The distances are computed once, with one breadth first flood per open
+    cell, and stored as an n x n table of unsigned 16-bit ints in a file named
+    after wallsHash(walls).  The file is memory-mapped, so getDistance is a
+    single array lookup, and later runs and other processes that use the same
+    walls map the same file instead of recomputing it.  If the cache directory
+    cannot be written, the table is kept in memory only.
+    """
+    UNREACHABLE = 0xFFFF
+
+    def __init__(self, walls, cacheDirectory=None):
+        self.walls = walls
+        self.graph = getMazeGraph(walls)
+        self.size = len(self.graph.openCells)
+        if cacheDirectory == None: cacheDirectory = DISTANCE_CACHE_DIRECTORY
+        self.path = os.path.join(cacheDirectory, wallsHash(walls) + '.u16')
+        self.table = self._load()
+        if self.table == None:
+            table = self._compute()
+            self._save(table)
+            self.table = self._load()
+            if self.table == None: self.table = table
+
+    def _compute(self):
+        graph, size = self.graph, self.size
+        openIndex, neighbours = graph.openIndex, graph.neighbours
+        table = array.array('H', [self.UNREACHABLE]) * (size * size)
+        for source, (x, y) in enumerate(graph.openCells):
+            row = source * size
+            table[row + source] = 0
+            queue = collections.deque([x * graph.height + y])
+            while queue:
+                index = queue.popleft()
+                distance = table[row + openIndex[index]] + 1
+                for action, nextIndex in neighbours[index]:
+                    column = row + openIndex[nextIndex]
+                    if table[column] == self.UNREACHABLE:
+                        table[column] = distance
+                        queue.append(nextIndex)
+        return table
+
+    def _save(self, table):
+        _saveTable(self.path, table)
+
+    def _load(self):
+        return _mapTable(self.path, self.size * self.size)
+
+    def getDistance(self, cell1, cell2):
+        "Returns the maze distance between two open cells, or None if unreachable"
+        graph = self.graph
+        i = graph.openIndex[cell1[0] * graph.height + cell1[1]]
+        j = graph.openIndex[cell2[0] * graph.height + cell2[1]]
+        if i == -1 or j == -1: raise ValueError('No maze distance to a wall cell')
+        distance = self.table[i * self.size + j]
+        if distance == self.UNREACHABLE: return None
+        return distance
+
+_DISTANCE_ORACLES = weakref.WeakKeyDictionary()
+
+def getDistanceOracle(walls):
+    "Returns the DistanceOracle of a walls Grid, loading or computing it once per Grid."
+    oracle = _DISTANCE_ORACLES.get(walls)
+    if oracle == None or oracle.walls is not walls:
+        oracle = DistanceOracle(walls)
+        _DISTANCE_ORACLES[walls] = oracle
+    return oracle
+
+INFINITY = float('inf')
+
+class CornersPatternDatabase:
+    """
+    The exact cost of visiting every corner not yet visited, from every cell
+    of a walls Grid and for every subset of visited corners.
+
+    The table is laid out like the int states of CornersProblem: the entry
+    for cell index i (see MazeGraph) and the 4-bit mask m of visited
+    corners, bit k for corners[k], is table[i << 4 | m], so a CornersProblem
+    state indexes it directly.  It is the cheapest order of visiting the
+    remaining corners, over maze distances from one breadth first flood per
+    corner, found by dynamic programming over the corner subsets.  Entries
+    from which some remaining corner cannot be reached are UNREACHABLE.
+
+    Like DistanceOracle, the table is cached as a memory-mapped file of
+    unsigned 16-bit ints, named after the walls and the corners.
+    """
+    UNREACHABLE = 0xFFFF
+
+    def __init__(self, walls, corners, cacheDirectory=None):
+        self.walls = walls
+        self.corners = tuple(corners)
+        self.graph = getMazeGraph(walls)
+        if cacheDirectory == None: cacheDirectory = DISTANCE_CACHE_DIRECTORY
+        name = hashlib.sha1(('%s %s' % (wallsHash(walls), self.corners)).encode()).hexdigest()
+        self.path = os.path.join(cacheDirectory, name + '.corners.u16')
+        self.table = _mapTable(self.path, self.graph.size << 4)
+        if self.table == None:
+            table = self._compute()
+            _saveTable(self.path, table)
+            self.table = _mapTable(self.path, self.graph.size << 4)
+            if self.table == None: self.table = table
+
+    def _compute(self):
+        graph = self.graph
+        cornerIndices = [graph.index(corner) for corner in self.corners]
+        cornerBits = {} # cell index -> bits of the corners in it
+        for k, index in enumerate(cornerIndices):
+            cornerBits[index] = cornerBits.get(index, 0) | 1 << k
+        distances = [] # distances[k][index]: maze distance from corners[k]
+        for start in cornerIndices:
+            distance = [INFINITY] * graph.size
+            distance[start] = 0
+            queue = collections.deque([start])
+            while queue:
+                index = queue.popleft()
+                for action, nextIndex in graph.neighbours[index]:
+                    if distance[nextIndex] == INFINITY:
+                        distance[nextIndex] = distance[index] + 1
+                        queue.append(nextIndex)
+            distances.append(distance)
+
+        # completion[k][mask]: cheapest tour of the corners missing from mask,
+        # starting at corners[k], with mask covering corners[k]
+        completion = [[INFINITY] * 16 for k in cornerIndices]
+        for mask in sorted(range(16), key=lambda mask: -bin(mask).count('1')):
+            for k, index in enumerate(cornerIndices):
+                if mask == 15:
+                    completion[k][mask] = 0
+                    continue
+                completion[k][mask] = min([distances[j][index] + completion[j][mask | cornerBits[cornerIndices[j]]]
+                                           for j in range(len(cornerIndices)) if not mask & 1 << j] or [INFINITY])
+
+        table = array.array('H', [self.UNREACHABLE]) * (graph.size << 4)
+        for x, y in graph.openCells:
+            index = x * graph.height + y
+            for mask in range(16):
+                if mask == 15:
+                    cost = 0
+                else:
+                    cost = min(distances[j][index] + completion[j][mask | cornerBits[cornerIndices[j]]]
+                               for j in range(len(cornerIndices)) if not mask & 1 << j)
+                if cost < self.UNREACHABLE:
+                    table[index << 4 | mask] = cost
+        return table
+
+_CORNERS_DATABASES = weakref.WeakKeyDictionary()
+
+def getCornersPatternDatabase(walls, corners):
+    "Returns the CornersPatternDatabase of a walls Grid and its corners, loading or computing it once."
+    database = _CORNERS_DATABASES.get(walls)
+    if database == None or database.walls is not walls or database.corners != tuple(corners):
+        database = CornersPatternDatabase(walls, corners)
+        _CORNERS_DATABASES[walls] = database
+    return database
+
+
+class DStarLite:
+    """
+    Incremental shortest paths on a walls Grid from a start cell to the
+    closest of a set of goal cells, with D* Lite (Koenig and Likhachev,
+    2002).  The search runs backwards from the goals and keeps its g and rhs
+    tables between calls to getPath.  Moving the start (setStart), adding or
+    removing goals (addGoal, removeGoal, for instance when a pellet is
+    eaten) and blocking or unblocking cells (setBlocked, for instance for a
+    ghost) only queue the cells whose rhs value changes, and the next
+    getPath repairs the part of the search tree they affect instead of
+    searching again.  Moves into or out of a blocked cell are impossible.
+
+    expanded counts the cells expanded over the life of the object.
+    """
+
+    def __init__(self, walls, goals, start):
+        self.walls = walls
+        self.graph = getMazeGraph(walls)
+        size = self.graph.size
+        self.g = [INFINITY] * size
+        self.rhs = [INFINITY] * size
+        self.goals = set()
+        self.blocked = set()
+        self.start = self.graph.index(start)
+        self.km = 0        # Sum of heuristic distances the start has moved
+        self.heap = []     # (key, index), with stale entries
+        self.queued = {}   # index -> key of the cells that are inconsistent
+        self.expanded = 0
+        for goal in goals:
+            self.addGoal(goal)
+
+    def _heuristic(self, index):
+        x1, y1 = divmod(index, self.graph.height)
+        x2, y2 = divmod(self.start, self.graph.height)
+        return abs(x1 - x2) + abs(y1 - y2)
+
+    def _key(self, index):
+        value = min(self.g[index], self.rhs[index])
+        return (value + self._heuristic(index) + self.km, value)
+
+    def _queue(self, index):
+        "Queues a cell if it is inconsistent, and unqueues it otherwise."
+        if self.g[index] != self.rhs[index]:
+            key = self._key(index)
+            self.queued[index] = key
+            heapq.heappush(self.heap, (key, index))
+        else:
+            self.queued.pop(index, None)
+
+    def _updateVertex(self, index):
+        if index not in self.goals:
+            best = INFINITY
+            if index not in self.blocked:
+                g, blocked = self.g, self.blocked
+                for action, nextIndex in self.graph.neighbours[index]:
+                    if nextIndex not in blocked and g[nextIndex] + 1 < best:
+                        best = g[nextIndex] + 1
+            self.rhs[index] = best
+        self._queue(index)
+
+    def _topKey(self):
+        heap, queued = self.heap, self.queued
+        while heap and queued.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap) # Stale
+        return heap[0][0] if heap else (INFINITY, INFINITY)
+
+    def _computeShortestPath(self):
+        g, rhs, neighbours = self.g, self.rhs, self.graph.neighbours
+        start = self.start
+        while True:
+            oldKey = self._topKey()
+            if not self.heap or not (oldKey < self._key(start) or rhs[start] != g[start]):
+                return
+            key, index = heapq.heappop(self.heap)
+            newKey = self._key(index)
+            if oldKey < newKey:
+                self.queued[index] = newKey
+                heapq.heappush(self.heap, (newKey, index))
+                continue
+            del self.queued[index]
+            self.expanded += 1
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+            else:
+                g[index] = INFINITY
+                self._updateVertex(index)
+            for action, nextIndex in neighbours[index]:
+                self._updateVertex(nextIndex)
+
+    def setStart(self, cell):
+        "Moves the start, for instance to Pacman's new position."
+        index = self.graph.index(cell)
+        self.km += self._heuristic(index)
+        self.start = index
+
+    def addGoal(self, cell):
+        index = self.graph.index(cell)
+        self.goals.add(index)
+        self.rhs[index] = 0
+        self._queue(index)
+
+    def removeGoal(self, cell):
+        index = self.graph.index(cell)
+        self.goals.discard(index)
+        self._updateVertex(index)
+
+    def setBlocked(self, cell, blocked=True):
+        "Blocks or unblocks an open cell, which changes the cost of the moves around it."
+        index = self.graph.index(cell)
+        if blocked:
+            self.blocked.add(index)
+        else:
+            self.blocked.discard(index)
+        self._updateVertex(index)
+        for action, nextIndex in self.graph.neighbours[index]:
+            self._updateVertex(nextIndex)
+
+    def getDistance(self):
+        "Returns the distance from the start to the closest goal, or None if unreachable"
+        self._computeShortestPath()
+        if self.g[self.start] == INFINITY and self.start not in self.goals:
+            return None
+        return 0 if self.start in self.goals else self.g[self.start]
+
+    def getPath(self):
+        "Returns the actions from the start to the closest goal, or None if unreachable"
+        if self.getDistance() is None:
+            return None
+        path = []
+        index = self.start
+        g, blocked = self.g, self.blocked
+        while index not in self.goals:
+            action, index = min(((action, nextIndex) for action, nextIndex in self.graph.neighbours[index]
+                                 if nextIndex not in blocked),
+                                key=lambda move: g[move[1]])
+            path.append(action)
+        return path
@@ -17,8 +17,26 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import array
+import collections
+import heapq
+import inspect
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import queue
+import signal
+import tempfile
+import threading
+import time
+import traceback
 import util
+import weakref
+import zlib
 from game import Directions
+from game import Actions
 from typing import List
 
 class SearchProblem:
@@ -66,6 +84,304 @@ class SearchProblem:
 
 
 
+class SearchNodes:
+    """
+    An arena of search nodes shared by the searches in this file.  A node is
+    an int index into flat arrays of parent node, action code and path cost
+    (g), plus a list of references to the node states; actions are stored as
+    small int codes and translated back only when a path is rebuilt.  A node
+    therefore costs a few machine words, rather than a list of every action
+    from the start, and the path is built once, by getPath, at the goal.
+    """
+
+    def __init__(self):
+        self.parents = array.array('l')
+        self.actionCodes = array.array('l')
+        self.costs = array.array('d')
+        self.states = []
+        self.actions = []      # code -> action
+        self.codes = {}        # action -> code
+
+    def add(self, state, parent=-1, action=None, cost=0):
+        "Stores a node and returns its index.  The root has parent -1."
+        if action is None:
+            code = -1
+        else:
+            code = self.codes.get(action)
+            if code is None:
+                code = self.codes[action] = len(self.actions)
+                self.actions.append(action)
+        self.parents.append(parent)
+        self.actionCodes.append(code)
+        self.costs.append(cost)
+        self.states.append(state)
+        return len(self.states) - 1
+
+    def truncate(self, size):
+        "Forgets every node from index size on."
+        del self.parents[size:]
+        del self.actionCodes[size:]
+        del self.costs[size:]
+        del self.states[size:]
+
+    def getPath(self, node):
+        "Returns the actions that lead from the root to a node."
+        codes = []
+        parents, actionCodes = self.parents, self.actionCodes
+        while parents[node] != -1:
+            codes.append(actionCodes[node])
+            node = parents[node]
+        codes.reverse()
+        return [self.actions[code] for code in codes]
+
+    def getPathToRoot(self, node):
+        """
+        Returns the actions stored from a node up to the root, in that order.
+        For a tree grown backwards from a goal, with the action of each node
+        leading from it to its parent, this is the path from the node to the
+        goal.
+        """
+        path = []
+        parents, actionCodes = self.parents, self.actionCodes
+        while parents[node] != -1:
+            path.append(self.actions[actionCodes[node]])
+            node = parents[node]
+        return path
+
+    def __len__(self):
+        return len(self.states)
+
+class SearchStats:
+    """
+    Statistics about one run of a search function in this file.  Every search
+    takes an optional stats argument; if none is given it makes a new
+    SearchStats, and either way the stats are left on the problem as
+    problem.searchStats, since the searches themselves return plain lists.
+
+      generated:      successors returned by getSuccessors
+      expanded:       states whose successors were generated
+      duplicates:     nodes dropped because their state had already been
+                      reached or expanded at no greater cost
+      peakFrontier:   largest frontier size seen at an expansion
+      peakClosed:     largest closed set size seen at an expansion
+      phaseTimes:     seconds spent in goal tests, in getSuccessors, in the
+                      heuristic and in total
+      heuristicCalls: number of heuristic evaluations
+      heuristicCacheHits, heuristicCacheMisses, heuristicCacheEvictions:
+                      lookups in the cache of a heuristic wrapped by
+                      memoizeHeuristic, if any
+      transpositionTableSize, transpositionTableEntries:
+                      slots in the transposition table of
+                      iterativeDeepeningAStarSearch, which keeps no closed
+                      set, and how many of them were filled
+
+    Anytime searches also record every plan they find in solutions, as
+    (seconds since the start, cost, suboptimality bound) triples, and the
+    bound of the plan they return in suboptimalityBound.
+
+    Functions added with addExpansionHook are called as
+    hook(state, cost, heuristicValue, frontierSize) for every expansion;
+    heuristicValue is None for searches without a heuristic.
+    """
+
+    def __init__(self):
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.heuristicCalls = 0
+        self.heuristicCacheHits = 0
+        self.heuristicCacheMisses = 0
+        self.heuristicCacheEvictions = 0
+        self.transpositionTableSize = 0
+        self.transpositionTableEntries = 0
+        self.phaseTimes = {'goal test': 0.0, 'successors': 0.0, 'heuristic': 0.0, 'total': 0.0}
+        self.solutions = []
+        self.suboptimalityBound = None
+        self.expansionHooks = []
+        self._startTime = None
+
+    def addExpansionHook(self, hook):
+        self.expansionHooks.append(hook)
+
+    def begin(self, problem):
+        "Attaches the stats to a problem and starts the total timer."
+        problem.searchStats = self
+        self._startTime = time.perf_counter()
+        return self
+
+    def finish(self, path):
+        "Stops the total timer and returns path, so searches can return stats.finish(path)."
+        self.phaseTimes['total'] += time.perf_counter() - self._startTime
+        return path
+
+    def snapshot(self):
+        "The counters and times so far, for SearchCheckpoint."
+        counters = dict((name, value) for name, value in vars(self).items()
+                        if name not in ('expansionHooks', '_startTime', 'phaseTimes'))
+        phaseTimes = dict(self.phaseTimes)
+        phaseTimes['total'] += time.perf_counter() - self._startTime
+        return counters, phaseTimes
+
+    def restore(self, snapshot):
+        "Carries on from counters and times returned by snapshot."
+        counters, phaseTimes = snapshot
+        vars(self).update(counters)
+        self.phaseTimes.update(phaseTimes)
+
+    def addSolution(self, cost, bound):
+        "Records a plan found by an anytime search."
+        self.solutions.append((time.perf_counter() - self._startTime, cost, bound))
+        self.suboptimalityBound = bound
+
+    def timeGoalTest(self, isGoalState):
+        phaseTimes = self.phaseTimes
+        def timedGoalTest(state):
+            start = time.perf_counter()
+            isGoal = isGoalState(state)
+            phaseTimes['goal test'] += time.perf_counter() - start
+            return isGoal
+        return timedGoalTest
+
+    def timeSuccessors(self, getSuccessors):
+        phaseTimes = self.phaseTimes
+        def timedSuccessors(state):
+            start = time.perf_counter()
+            successors = getSuccessors(state)
+            phaseTimes['successors'] += time.perf_counter() - start
+            self.generated += len(successors)
+            return successors
+        return timedSuccessors
+
+    def timeHeuristic(self, heuristic):
+        phaseTimes = self.phaseTimes
+        def timedHeuristic(state, problem=None):
+            start = time.perf_counter()
+            value = heuristic(state, problem)
+            phaseTimes['heuristic'] += time.perf_counter() - start
+            self.heuristicCalls += 1
+            return value
+        return timedHeuristic
+
+    def expand(self, state, cost, heuristicValue, frontierSize, closedSize):
+        "Records the expansion of a state and calls the expansion hooks."
+        self.expanded += 1
+        if frontierSize > self.peakFrontier: self.peakFrontier = frontierSize
+        if closedSize > self.peakClosed: self.peakClosed = closedSize
+        for hook in self.expansionHooks:
+            hook(state, cost, heuristicValue, frontierSize)
+
+    def __str__(self):
+        times = ', '.join('%s %.3fs' % (phase, seconds) for phase, seconds in self.phaseTimes.items())
+        text = ('Search stats: %d expanded, %d generated, %d duplicates, peak frontier %d, '
+                'peak closed %d, %d heuristic calls; %s' %
+                (self.expanded, self.generated, self.duplicates, self.peakFrontier,
+                 self.peakClosed, self.heuristicCalls, times))
+        if self.heuristicCacheHits or self.heuristicCacheMisses:
+            text += ('; heuristic cache %d hits, %d misses, %d evictions' %
+                     (self.heuristicCacheHits, self.heuristicCacheMisses, self.heuristicCacheEvictions))
+        if self.transpositionTableSize:
+            text += ('; transposition table %d of %d slots filled' %
+                     (self.transpositionTableEntries, self.transpositionTableSize))
+        if self.solutions:
+            text += '; %d plans, best within %.3f of optimal' % (len(self.solutions), self.suboptimalityBound)
+        return text
+
+class SearchCheckpoint:
+    """
+    Saves the state of a search to a file, so that a later call of the same
+    search on the same problem resumes where it stopped instead of starting
+    over.  The searches that take a checkpoint argument (depthFirstSearch,
+    breadthFirstSearch, uniformCostSearch, aStarSearch and bestFirstSearch)
+    save their frontier, closed set, SearchNodes arena and stats:
+
+      every interval seconds, if interval is given;
+      at the next expansion after one of signals arrives (e.g. signal.SIGUSR1
+        or signal.SIGTERM), after which the search carries on;
+      and never after the search has returned, when the file is removed.
+
+    The file is a zlib-compressed pickle, written to a temporary file and
+    renamed, so a crash while saving leaves the previous checkpoint intact.
+    It is only resumed by the same algorithm on a problem of the same class,
+    walls and start state.  Signal handlers can only be installed from the
+    main thread; elsewhere signals are ignored.
+    """
+
+    def __init__(self, fileName, interval=None, signals=()):
+        self.fileName = fileName
+        self.interval = interval
+        self.signals = signals
+        self.saves = 0
+        self._requested = False
+        self._nextSave = None
+        self._oldHandlers = {}
+
+    def _key(self, problem, algorithm):
+        walls = getattr(problem, 'walls', None)
+        if walls != None:
+            import mazeDistances
+            walls = mazeDistances.wallsHash(walls)
+        return (algorithm, type(problem).__name__, walls, problem.getStartState())
+
+    def start(self, problem, algorithm):
+        """
+        Installs the signal handlers and returns the saved search for this
+        problem and algorithm, or None if there is none to resume or the
+        file cannot be loaded: it is missing or unreadable, truncated or
+        corrupt, or was pickled by a version of the code whose classes or
+        modules have since changed.  Any other error propagates.  The
+        searches call stop in the same try block, so the handlers are
+        restored even if resuming fails.
+        """
+        if self.interval != None:
+            self._nextSave = time.perf_counter() + self.interval
+        if threading.current_thread() is threading.main_thread():
+            for signalNumber in self.signals:
+                self._oldHandlers[signalNumber] = signal.signal(signalNumber, self._request)
+        try:
+            with open(self.fileName, 'rb') as checkpointFile:
+                key, saved = pickle.loads(zlib.decompress(checkpointFile.read()))
+        except (OSError, EOFError, zlib.error, pickle.UnpicklingError, ValueError):
+            return None # Missing, unreadable, truncated or corrupt
+        except (AttributeError, ImportError):
+            return None # Saved by code whose classes or modules have changed since
+        if key != self._key(problem, algorithm):
+            return None
+        return saved
+
+    def _request(self, signalNumber, frame):
+        self._requested = True
+
+    def isDue(self):
+        "True if a signal has arrived or the interval has passed since the last save."
+        return self._requested or (self._nextSave != None and time.perf_counter() >= self._nextSave)
+
+    def save(self, problem, algorithm, search):
+        "Writes search, a picklable snapshot of the search, to the checkpoint file."
+        data = zlib.compress(pickle.dumps((self._key(problem, algorithm), search), pickle.HIGHEST_PROTOCOL))
+        directory = os.path.dirname(os.path.abspath(self.fileName))
+        descriptor, temporaryName = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as checkpointFile:
+                checkpointFile.write(data)
+            os.replace(temporaryName, self.fileName)
+        except OSError:
+            os.unlink(temporaryName)
+            raise
+        self.saves += 1
+        self._requested = False
+        if self.interval != None:
+            self._nextSave = time.perf_counter() + self.interval
+
+    def stop(self, finished):
+        "Restores the signal handlers, and removes the file once the search has returned."
+        for signalNumber, handler in self._oldHandlers.items():
+            signal.signal(signalNumber, handler)
+        self._oldHandlers = {}
+        if finished and os.path.exists(self.fileName):
+            os.unlink(self.fileName)
+
 def tinyMazeSearch(problem: SearchProblem) -> List[Directions]:
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -75,7 +391,62 @@ def tinyMazeSearch(problem: SearchProblem) -> List[Directions]:
     w = Directions.WEST
     return  [s, s, w, s, w, w, s, w]
 
-def depthFirstSearch(problem: SearchProblem) -> List[Directions]:
+class SearchEvent:
+    """
+    One expansion reported by the event generators below: the expanded
+    state, its path cost g, and the frontier size at that moment.
+    heuristicValue is the h of the state, or None for searches without a
+    heuristic; unless the search passes it in, it is computed on first use,
+    so consumers that ignore it cost no extra heuristic calls.
+    """
+    __slots__ = ('state', 'cost', 'frontierSize', '_heuristic', '_problem', '_heuristicValue')
+
+    def __init__(self, state, cost, frontierSize, heuristic=None, problem=None, heuristicValue=None):
+        self.state = state
+        self.cost = cost
+        self.frontierSize = frontierSize
+        self._heuristic = heuristic
+        self._problem = problem
+        self._heuristicValue = heuristicValue
+
+    @property
+    def heuristicValue(self):
+        if self._heuristicValue == None and self._heuristic != None:
+            self._heuristicValue = self._heuristic(self.state, self._problem)
+        return self._heuristicValue
+
+    def __iter__(self):
+        "Unpacks as state, cost, heuristicValue, frontierSize."
+        return iter((self.state, self.cost, self.heuristicValue, self.frontierSize))
+
+    def __repr__(self):
+        return 'SearchEvent(%r, g=%r, h=%r, frontier=%d)' % (self.state, self.cost, self.heuristicValue, self.frontierSize)
+
+def _saveSearch(problem, stats, *structures):
+    "A snapshot for SearchCheckpoint.save of a search's data structures, stats and problem._expanded."
+    return structures, stats.snapshot(), getattr(problem, '_expanded', None)
+
+def _restoreSearch(saved, problem, stats):
+    "Restores the stats and problem._expanded of a snapshot made by _saveSearch, and returns its structures."
+    structures, statsSnapshot, expanded = saved
+    stats.restore(statsSnapshot)
+    if expanded != None:
+        problem._expanded = expanded
+    return structures
+
+def drainSearch(events) -> List[Directions]:
+    """
+    Runs an event generator such as aStarSearchEvents to the end and returns
+    its path.  The generators return the path when they finish, so it is
+    the value of their StopIteration.
+    """
+    while True:
+        try:
+            next(events)
+        except StopIteration as done:
+            return done.value
+
+def depthFirstSearch(problem: SearchProblem, stats=None, checkpoint=None) -> List[Directions]:
     """
     Search the deepest nodes in the search tree first.
 
@@ -88,19 +459,130 @@ def depthFirstSearch(problem: SearchProblem) -> List[Directions]:
     print("Start:", problem.getStartState())
     print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     print("Start's successors:", problem.getSuccessors(problem.getStartState()))
+
+    A SearchCheckpoint passed as checkpoint saves the search as it runs and
+    resumes a saved one.
     """
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    return drainSearch(depthFirstSearchEvents(problem, stats, checkpoint))
+
+def depthFirstSearchEvents(problem: SearchProblem, stats=None, checkpoint=None):
+    """
+    depthFirstSearch as a generator that yields a SearchEvent per expansion
+    and returns the path.  Closing it early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    finished = False
+
+    try:
+        saved = None if checkpoint == None else checkpoint.start(problem, 'depthFirstSearch')
+        if saved == None:
+            nodes = SearchNodes()
+            frontier = util.Stack()
+            frontier.push(nodes.add(problem.getStartState()))
+            expanded = set()
+        else:
+            frontier, nodes, expanded = _restoreSearch(saved, problem, stats)
+        isGoalState = stats.timeGoalTest(problem.isGoalState)
+        getSuccessors = stats.timeSuccessors(problem.getSuccessors)
 
-def breadthFirstSearch(problem: SearchProblem) -> List[Directions]:
-    """Search the shallowest nodes in the search tree first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+        while not frontier.isEmpty():
+            if checkpoint != None and checkpoint.isDue():
+                checkpoint.save(problem, 'depthFirstSearch', _saveSearch(problem, stats, frontier, nodes, expanded))
+            node = frontier.pop()
+            state = nodes.states[node]
+            if isGoalState(state):
+                finished = True
+                return nodes.getPath(node)
+            if state in expanded:
+                stats.duplicates += 1
+                continue
+            expanded.add(state)
+            cost = nodes.costs[node]
+            stats.expand(state, cost, None, len(frontier), len(expanded))
+            yield SearchEvent(state, cost, len(frontier))
+            for successor, action, stepCost in getSuccessors(state):
+                if successor not in expanded:
+                    frontier.push(nodes.add(successor, node, action, cost + stepCost))
+                else:
+                    stats.duplicates += 1
+        finished = True
+        return []
+    finally:
+        stats.finish(None)
+        if checkpoint != None:
+            checkpoint.stop(finished)
 
-def uniformCostSearch(problem: SearchProblem) -> List[Directions]:
+def breadthFirstSearch(problem: SearchProblem, frontier=None, stats=None, checkpoint=None) -> List[Directions]:
+    """
+    Search the shallowest nodes in the search tree first.
+
+    The frontier holds SearchNodes indices and defaults to a util.DequeQueue;
+    any FIFO container with the push/pop/isEmpty/extend interface and a len
+    can be passed in instead.  A SearchCheckpoint passed as checkpoint saves
+    the search as it runs and resumes a saved one, frontier included.
+    """
+    return drainSearch(breadthFirstSearchEvents(problem, frontier, stats, checkpoint))
+
+def breadthFirstSearchEvents(problem: SearchProblem, frontier=None, stats=None, checkpoint=None):
+    """
+    breadthFirstSearch as a generator that yields a SearchEvent per
+    expansion and returns the path.  Closing it early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    finished = False
+
+    try:
+        saved = None if checkpoint == None else checkpoint.start(problem, 'breadthFirstSearch')
+        if saved == None:
+            if frontier is None:
+                frontier = util.DequeQueue()
+            nodes = SearchNodes()
+            frontier.push(nodes.add(problem.getStartState()))
+            expanded = set()
+        else:
+            frontier, nodes, expanded = _restoreSearch(saved, problem, stats)
+        isGoalState = stats.timeGoalTest(problem.isGoalState)
+        getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+
+        while not frontier.isEmpty():
+            if checkpoint != None and checkpoint.isDue():
+                checkpoint.save(problem, 'breadthFirstSearch', _saveSearch(problem, stats, frontier, nodes, expanded))
+            node = frontier.pop()
+            state = nodes.states[node]
+            if isGoalState(state):
+                finished = True
+                return nodes.getPath(node)
+            if state in expanded:
+                stats.duplicates += 1
+                continue
+            expanded.add(state)
+            cost = nodes.costs[node]
+            stats.expand(state, cost, None, len(frontier), len(expanded))
+            yield SearchEvent(state, cost, len(frontier))
+            successors = getSuccessors(state)
+            frontierSize = len(frontier)
+            frontier.extend(nodes.add(successor, node, action, cost + stepCost)
+                            for successor, action, stepCost in successors
+                            if successor not in expanded)
+            stats.duplicates += len(successors) - (len(frontier) - frontierSize)
+        finished = True
+        return []
+    finally:
+        stats.finish(None)
+        if checkpoint != None:
+            checkpoint.stop(finished)
+
+def uniformCostSearch(problem: SearchProblem, stats=None, checkpoint=None) -> List[Directions]:
     """Search the node of least total cost first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    return bestFirstSearch(problem, nullHeuristic, stats=stats, checkpoint=checkpoint)
+
+def uniformCostSearchEvents(problem: SearchProblem, stats=None, checkpoint=None):
+    """uniformCostSearch as a generator of SearchEvents that returns the path."""
+    return bestFirstSearchEvents(problem, None, stats=stats, checkpoint=checkpoint)
 
 def nullHeuristic(state, problem=None) -> float:
     """
@@ -109,13 +591,1345 @@ def nullHeuristic(state, problem=None) -> float:
     """
     return 0
 
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
+def memoizeHeuristic(heuristic, maxSize=65536):
+    """
+    Wraps a heuristic, a pure function of (state, problem), in a bounded LRU
+    cache of its values by state, for searches that evaluate it again on
+    states they generate again.  The wrapper has the same (state,
+    problem=None) signature, so it can be passed anywhere a heuristic can.
+
+    Each problem gets its own cache, held in a WeakKeyDictionary so that
+    it goes away with the problem; bidirectionalAStarSearch, which calls
+    the heuristic on problem and on a ReverseSearchProblem in turn, keeps
+    both.  Problems that cannot be weakly referenced, and calls without a
+    problem, share one more cache, which is emptied when the problem
+    changes.  Once a cache holds maxSize states, its least recently used
+    one is evicted.  Hits, misses and evictions are added to the problem's
+    searchStats (see SearchStats), and the totals since the wrapper was
+    made are returned by its cacheInfo() as a (hits, misses, evictions,
+    size) tuple, size being the states held in all caches.
+
+    bestFirstSearch, iterativeDeepeningAStarSearch and
+    anytimeRepairingAStarSearch already evaluate the heuristic about once
+    per state, so the cache pays off mostly for limitedDiscrepancySearch,
+    which generates states again, and for several searches of one problem.
+    """
+    caches = weakref.WeakKeyDictionary() # problem -> OrderedDict of state -> value, least recently used first
+    sharedCache = collections.OrderedDict() # For problems that caches cannot hold
+    owner = None # The problem the values in sharedCache belong to
+    hits = misses = evictions = 0
+
+    def cacheFor(problem):
+        nonlocal owner
+        try:
+            cache = caches.get(problem)
+            if cache is None:
+                cache = caches[problem] = collections.OrderedDict()
+            return cache
+        except TypeError: # Not weakly referenceable, or not hashable
+            if problem is not owner:
+                sharedCache.clear()
+                owner = problem
+            return sharedCache
+
+    def memoizedHeuristic(state, problem=None):
+        nonlocal hits, misses, evictions
+        cache = cacheFor(problem)
+        stats = getattr(problem, 'searchStats', None)
+        try:
+            value = cache[state]
+        except KeyError:
+            value = cache[state] = heuristic(state, problem)
+            misses += 1
+            if stats != None: stats.heuristicCacheMisses += 1
+            if len(cache) > maxSize:
+                cache.popitem(last=False)
+                evictions += 1
+                if stats != None: stats.heuristicCacheEvictions += 1
+            return value
+        cache.move_to_end(state)
+        hits += 1
+        if stats != None: stats.heuristicCacheHits += 1
+        return value
+
+    def cacheInfo():
+        return hits, misses, evictions, len(sharedCache) + sum(len(cache) for cache in caches.values())
+
+    memoizedHeuristic.cacheInfo = cacheInfo
+    memoizedHeuristic.__name__ = 'memoized ' + getattr(heuristic, '__name__', 'heuristic')
+    memoizedHeuristic.__wrapped__ = heuristic
+    return memoizedHeuristic
+
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, stats=None, checkpoint=None) -> List[Directions]:
     """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    return bestFirstSearch(problem, heuristic, stats=stats, checkpoint=checkpoint)
+
+def aStarSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, stats=None, checkpoint=None):
+    """aStarSearch as a generator of SearchEvents that returns the path."""
+    return bestFirstSearchEvents(problem, heuristic, stats=stats, checkpoint=checkpoint)
+
+def bestFirstSearch(problem: SearchProblem, heuristic=nullHeuristic, frontier=None, stats=None,
+                    checkpoint=None) -> List[Directions]:
+    """
+    Graph search that always expands the frontier state with the lowest
+    g + h, shared by uniformCostSearch and aStarSearch.
+
+    The frontier holds each state at most once and is kept up to date with
+    update (decrease-key) whenever a cheaper path to a state is found.  Any
+    object with the push/pop/isEmpty/update interface of util.PriorityQueue
+    can be passed in.  The default is a util.IndexedPriorityQueue in lazy
+    mode.  util.BucketQueue and util.RadixHeap can be passed in for integer
+    costs, but in CPython neither beats heapq, even on the queue operations
+    alone (see searchBenchmarks.py -b queueops), so they are never picked
+    automatically.  A queue that rejects a priority with ValueError is
+    replaced as _replaceFrontier describes, and the search carries on in
+    the same order: a BucketQueue moves to a RadixHeap for large integer
+    costs, and anything else to an IndexedPriorityQueue.
+
+    An expanded state is reopened if a cheaper path to it turns up later,
+    which can only happen with an inconsistent heuristic.
+
+    A SearchCheckpoint passed as checkpoint saves the search as it runs and
+    resumes a saved one; a checkpoint is only resumed with a heuristic of
+    the same name.
+    """
+    return drainSearch(bestFirstSearchEvents(problem, heuristic, frontier, stats, checkpoint))
+
+def _replaceFrontier(frontier, item, priority):
+    """
+    Moves the items of a frontier that rejected priority with ValueError to
+    a queue that accepts it, updates item to priority there and returns the
+    new queue.  A util.BucketQueue whose buckets would get too sparse for an
+    integer priority moves to a util.RadixHeap, and any other queue, or a
+    RadixHeap given a priority below its last pop, to a
+    util.IndexedPriorityQueue.
+    """
+    while True:
+        integral = isinstance(priority, int) or (isinstance(priority, float) and priority.is_integer())
+        if isinstance(frontier, util.BucketQueue) and integral:
+            frontier = frontier.toRadixHeap()
+        else:
+            frontier = frontier.toIndexedPriorityQueue()
+        try:
+            frontier.update(item, priority)
+            return frontier
+        except ValueError:
+            pass
+
+def bestFirstSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, frontier=None, stats=None,
+                          checkpoint=None):
+    """
+    bestFirstSearch as a generator that yields a SearchEvent per expansion
+    and returns the path.  Closing it early stops the search.  A heuristic
+    of None searches by g alone, like nullHeuristic, but its events have no
+    heuristicValue.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    untimedHeuristic = heuristic
+    heuristic = stats.timeHeuristic(nullHeuristic if heuristic == None else heuristic)
+    algorithm = 'bestFirstSearch %s' % getattr(untimedHeuristic, '__name__', untimedHeuristic)
+    finished = False
+
+    try:
+        saved = None if checkpoint == None else checkpoint.start(problem, algorithm)
+        if saved == None:
+            if frontier is None:
+                frontier = util.IndexedPriorityQueue(lazy=True)
+            nodes = SearchNodes()
+            start = problem.getStartState()
+            priority = heuristic(start, problem)
+            try:
+                frontier.push(start, priority)
+            except ValueError:
+                frontier = _replaceFrontier(frontier, start, priority)
+            bestNode = {start: nodes.add(start)} # state -> node of the cheapest known path
+            closed = {} # state -> cost at which it was expanded
+        else:
+            frontier, nodes, bestNode, closed = _restoreSearch(saved, problem, stats)
+        isGoalState = stats.timeGoalTest(problem.isGoalState)
+        getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+        costs = nodes.costs
+        infinity = float('inf')
+
+        while not frontier.isEmpty():
+            if checkpoint != None and checkpoint.isDue():
+                checkpoint.save(problem, algorithm, _saveSearch(problem, stats, frontier, nodes, bestNode, closed))
+            state = frontier.pop()
+            node = bestNode[state]
+            if isGoalState(state):
+                finished = True
+                return nodes.getPath(node)
+            cost = costs[node]
+            if closed.get(state, infinity) <= cost:
+                stats.duplicates += 1
+                continue
+            closed[state] = cost
+            event = SearchEvent(state, cost, len(frontier), untimedHeuristic, problem)
+            if stats.expansionHooks:
+                stats.expand(state, cost, event.heuristicValue, len(frontier), len(closed))
+            else:
+                stats.expand(state, cost, None, len(frontier), len(closed))
+            yield event
+
+            for successor, action, stepCost in getSuccessors(state):
+                newCost = cost + stepCost
+                known = bestNode.get(successor)
+                if known is None or newCost < costs[known]:
+                    bestNode[successor] = nodes.add(successor, node, action, newCost)
+                    priority = newCost + heuristic(successor, problem)
+                    try:
+                        frontier.update(successor, priority)
+                    except ValueError:
+                        frontier = _replaceFrontier(frontier, successor, priority)
+                else:
+                    stats.duplicates += 1
+        finished = True
+        return []
+    finally:
+        stats.finish(None)
+        if checkpoint != None:
+            checkpoint.stop(finished)
+
+class ReverseSearchProblem(SearchProblem):
+    """
+    A search problem with a single goal state, problem.goal, seen backwards:
+    it starts at the goal, ends at the start state, and its successors are
+    the predecessors of the original problem, from getPredecessors.  Heuristics
+    that estimate the distance to problem.goal, such as manhattanHeuristic,
+    therefore estimate the distance to the original start on this problem.
+    Other attributes are read from the original problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self.problem.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getPredecessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def bidirectionalBreadthFirstSearch(problem: SearchProblem, stats=None) -> List[Directions]:
+    """
+    Breadth first search from the start state and from problem.goal at once,
+    for problems with a single goal state and a getPredecessors method, such
+    as PositionSearchProblem.  getPredecessors(state) returns triples
+    (predecessor, action, stepCost) where action leads from predecessor to
+    state.
+
+    Each step expands a whole layer on the side whose frontier is smaller.
+    The search stops at the end of the first layer that reaches a state the
+    other side has reached, and returns the shortest of the paths through
+    such states; this is a shortest path in number of actions, as with
+    breadthFirstSearch.
+    """
+    return drainSearch(bidirectionalBreadthFirstSearchEvents(problem, stats))
+
+def bidirectionalBreadthFirstSearchEvents(problem: SearchProblem, stats=None):
+    """
+    bidirectionalBreadthFirstSearch as a generator that yields a
+    SearchEvent per expansion, on either side, and returns the path.  The
+    cost of an event is its number of steps from the start or the goal.
+    Closing it early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+
+    try:
+        start = problem.getStartState()
+        if problem.isGoalState(start):
+            return []
+        forward, backward = SearchNodes(), SearchNodes()
+        forwardReached = {start: forward.add(start)}
+        backwardReached = {problem.goal: backward.add(problem.goal)}
+        forwardLayer, backwardLayer = [forwardReached[start]], [backwardReached[problem.goal]]
+        forwardSuccessors = stats.timeSuccessors(problem.getSuccessors)
+        backwardSuccessors = stats.timeSuccessors(problem.getPredecessors)
+
+        while forwardLayer and backwardLayer:
+            if len(forwardLayer) <= len(backwardLayer):
+                nodes, reached, layer, getSuccessors = forward, forwardReached, forwardLayer, forwardSuccessors
+                otherNodes, otherReached = backward, backwardReached
+            else:
+                nodes, reached, layer, getSuccessors = backward, backwardReached, backwardLayer, backwardSuccessors
+                otherNodes, otherReached = forward, forwardReached
+            frontierSize = len(forwardLayer) + len(backwardLayer)
+            nextLayer = []
+            bestLength, meeting = None, None
+            for node in layer:
+                state = nodes.states[node]
+                depth = nodes.costs[node] # Step counts, not path costs
+                stats.expand(state, depth, None, frontierSize, len(forwardReached) + len(backwardReached))
+                yield SearchEvent(state, depth, frontierSize)
+                for successor, action, stepCost in getSuccessors(state):
+                    if successor in reached:
+                        stats.duplicates += 1
+                        continue
+                    child = nodes.add(successor, node, action, depth + 1)
+                    reached[successor] = child
+                    nextLayer.append(child)
+                    if successor in otherReached:
+                        length = depth + 1 + otherNodes.costs[otherReached[successor]]
+                        if bestLength is None or length < bestLength:
+                            bestLength, meeting = length, successor
+            if nodes is forward:
+                forwardLayer = nextLayer
+            else:
+                backwardLayer = nextLayer
+            if meeting is not None:
+                return forward.getPath(forwardReached[meeting]) + backward.getPathToRoot(backwardReached[meeting])
+        return []
+    finally:
+        stats.finish(None)
+
+class _SearchDirection:
+    "One side of bidirectionalAStarSearch: its problem, nodes and frontier."
+    def __init__(self, problem, getSuccessors):
+        self.problem = problem
+        self.getSuccessors = getSuccessors
+        self.nodes = SearchNodes()
+        self.frontier = util.IndexedPriorityQueue()
+        self.bestNode = {} # state -> node of the cheapest known path
+        self.closed = {}   # state -> cost at which it was expanded
+
+    def reach(self, state, parent, action, cost, heuristic):
+        self.bestNode[state] = self.nodes.add(state, parent, action, cost)
+        self.frontier.update(state, cost + heuristic(state, self.problem))
+
+    def getCost(self, state):
+        return self.nodes.costs[self.bestNode[state]]
+
+def bidirectionalAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, stats=None) -> List[Directions]:
+    """
+    Front-to-end bidirectional A*, for the same problems as
+    bidirectionalBreadthFirstSearch.  The forward search estimates the
+    distance to problem.goal with heuristic(state, problem); the backward
+    search estimates the distance to the start with
+    heuristic(state, ReverseSearchProblem(problem)).  Each step expands the
+    best state of the side with the smaller frontier.
+
+    Every path from the start to the goal has a state on each frontier, so
+    the lowest f on either frontier is a lower bound on the optimal cost.
+    The search stops once the cheapest meeting path found costs no more than
+    the larger of the two, which makes the result optimal for admissible
+    heuristics.
+    """
+    return drainSearch(bidirectionalAStarSearchEvents(problem, heuristic, stats))
+
+def bidirectionalAStarSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, stats=None):
+    """
+    bidirectionalAStarSearch as a generator that yields a SearchEvent per
+    expansion, on either side, and returns the path.  The cost of a
+    backward event is its cost to the goal, and its heuristicValue the
+    estimate of its distance to the start.  Closing it early stops the
+    search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+
+    try:
+        start = problem.getStartState()
+        if problem.isGoalState(start):
+            return []
+        untimedHeuristic = heuristic
+        heuristic = stats.timeHeuristic(heuristic)
+        forward = _SearchDirection(problem, stats.timeSuccessors(problem.getSuccessors))
+        backward = _SearchDirection(ReverseSearchProblem(problem), stats.timeSuccessors(problem.getPredecessors))
+        forward.reach(start, -1, None, 0, heuristic)
+        backward.reach(problem.goal, -1, None, 0, heuristic)
+        bestCost, meeting = float('inf'), None
+
+        while not (forward.frontier.isEmpty() and backward.frontier.isEmpty()):
+            sides = [side for side in (forward, backward) if not side.frontier.isEmpty()]
+            if meeting is None and len(sides) == 1 and forward.frontier.isEmpty():
+                break # Everything reachable from the start is expanded: no path
+            if bestCost <= max(side.frontier.peekPriority() for side in sides):
+                break
+            side = min(sides, key=lambda side: len(side.frontier))
+            other = backward if side is forward else forward
+            state = side.frontier.pop()
+            node = side.bestNode[state]
+            cost = side.nodes.costs[node]
+            if state in side.closed and side.closed[state] <= cost:
+                stats.duplicates += 1
+                continue
+            side.closed[state] = cost
+            frontierSize = len(forward.frontier) + len(backward.frontier)
+            stats.expand(state, cost, None, frontierSize, len(forward.closed) + len(backward.closed))
+            yield SearchEvent(state, cost, frontierSize, untimedHeuristic, side.problem)
+
+            for successor, action, stepCost in side.getSuccessors(state):
+                newCost = cost + stepCost
+                if successor in side.bestNode and newCost >= side.getCost(successor):
+                    stats.duplicates += 1
+                    continue
+                side.reach(successor, node, action, newCost, heuristic)
+                if successor in other.bestNode and newCost + other.getCost(successor) < bestCost:
+                    bestCost, meeting = newCost + other.getCost(successor), successor
+
+        if meeting is None:
+            return []
+        return forward.nodes.getPath(forward.bestNode[meeting]) + backward.nodes.getPathToRoot(backward.bestNode[meeting])
+    finally:
+        stats.finish(None)
+
+def iterativeDeepeningAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, tableSize=65521, stats=None) -> List[Directions]:
+    """
+    IDA*: repeated depth first searches that cut off every node with
+    g + h above a bound, starting from h(start) and raising the bound to the
+    smallest f that was cut off, until a goal is reached.  The first goal
+    found is optimal for an admissible heuristic.
+
+    Memory does not grow with the number of states explored: the search
+    keeps the current path, with one successor list per state on it, and a
+    transposition table of tableSize slots.  Each state is hashed to a slot
+    that records (state, g, iteration, h); a later visit to the same state
+    in the same iteration with no smaller g is pruned, which cuts cycles
+    and most transpositions, and h is reused whenever the slot still holds
+    the state.  A colliding state simply replaces the old entry.  Slots are
+    picked with hash(state) % tableSize, and the low bits of the hashes of
+    tuple states are far from uniform, so tableSize should be a prime.
+    """
+    return drainSearch(iterativeDeepeningAStarSearchEvents(problem, heuristic, tableSize, stats))
+
+def iterativeDeepeningAStarSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, tableSize=65521, stats=None):
+    """
+    iterativeDeepeningAStarSearch as a generator that yields a SearchEvent
+    per expansion, in every iteration, and returns the path.  The
+    frontierSize of an event is the depth of the current path.  Closing it
+    early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    isGoalState = stats.timeGoalTest(problem.isGoalState)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+
+    try:
+        table = [None] * tableSize
+        stats.transpositionTableSize = tableSize
+        start = problem.getStartState()
+        bound = heuristic(start, problem)
+        iteration = 0
+
+        while True:
+            iteration += 1
+            nextBound = float('inf')
+            frames = [] # (state, g, successor iterator, action that led to state)
+            state, g, action = start, 0, None
+            while True:
+                slot = hash(state) % tableSize
+                entry = table[slot]
+                if entry is not None and entry[0] == state:
+                    h = entry[3]
+                else:
+                    entry, h = None, heuristic(state, problem)
+                if g + h > bound:
+                    nextBound = min(nextBound, g + h)
+                    if entry is None:
+                        if table[slot] is None: stats.transpositionTableEntries += 1
+                        table[slot] = (state, float('inf'), iteration, h) # Keep h only
+                elif isGoalState(state):
+                    return [frame[3] for frame in frames[1:]] + ([action] if frames else [])
+                elif entry is not None and entry[2] == iteration and entry[1] <= g:
+                    stats.duplicates += 1
+                else:
+                    if table[slot] is None: stats.transpositionTableEntries += 1
+                    table[slot] = (state, g, iteration, h)
+                    stats.expand(state, g, h, len(frames), 0)
+                    yield SearchEvent(state, g, len(frames), heuristicValue=h)
+                    frames.append((state, g, iter(getSuccessors(state)), action))
+
+                # Move on to the next successor of the deepest state that has one
+                while frames:
+                    parentState, parentCost, successors, parentAction = frames[-1]
+                    successor = next(successors, None)
+                    if successor is not None:
+                        state, action, stepCost = successor
+                        g = parentCost + stepCost
+                        break
+                    frames.pop()
+                else:
+                    break
+            if nextBound == float('inf'):
+                return []
+            bound = nextBound
+    finally:
+        stats.finish(None)
+
+def anytimeRepairingAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, deadline=None,
+                                initialWeight=3.0, weightStep=0.5, stats=None) -> List[Directions]:
+    """
+    Anytime Repairing A* (ARA*).  The first plan comes from weighted A*, which
+    orders the frontier by g + weight * h and costs at most weight times the
+    optimum for an admissible heuristic.  The weight is then lowered by
+    weightStep at a time, down to 1, and each pass repairs the previous
+    search rather than starting over: the frontier is re-keyed for the new
+    weight, and states whose cost improved after they were expanded in the
+    last pass (the INCONS list of the ARA* paper) are put back on it.
+
+    deadline is a time.time() value.  Once a plan exists, the search stops
+    at the deadline and returns the best plan so far; the first plan is
+    always completed.  Each plan is recorded in stats.solutions with its
+    suboptimality bound, min(weight, cost / lowest g + h still open), which
+    is also left in stats.suboptimalityBound.
+    """
+    return drainSearch(anytimeRepairingAStarSearchEvents(problem, heuristic, deadline, initialWeight,
+                                                         weightStep, stats))
+
+def anytimeRepairingAStarSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, deadline=None,
+                                      initialWeight=3.0, weightStep=0.5, stats=None):
+    """
+    anytimeRepairingAStarSearch as a generator that yields a SearchEvent per
+    expansion, in every pass, and returns the path.  Closing it early stops
+    the search; a caller that wants the best plan so far rather than none
+    should give a deadline instead.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    isGoalState = stats.timeGoalTest(problem.isGoalState)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+
+    try:
+        nodes = SearchNodes()
+        costs = nodes.costs
+        start = problem.getStartState()
+        bestNode = {start: nodes.add(start)}
+        hValues = {start: heuristic(start, problem)}
+        weight = max(initialWeight, 1.0)
+        frontier = util.IndexedPriorityQueue()
+        frontier.push(start, weight * hValues[start])
+        inconsistent = set()
+        incumbent, incumbentCost = None, float('inf') # Best goal node and its cost
+
+        while True:
+            # Improve the plan for the current weight
+            closed = set()
+            while not frontier.isEmpty() and frontier.peekPriority() < incumbentCost:
+                if incumbent is not None and deadline is not None and time.time() >= deadline:
+                    return nodes.getPath(incumbent)
+                state = frontier.pop()
+                node = bestNode[state]
+                cost = costs[node]
+                if isGoalState(state):
+                    if cost < incumbentCost:
+                        incumbent, incumbentCost = node, cost
+                    continue
+                closed.add(state)
+                stats.expand(state, cost, hValues[state], len(frontier), len(closed))
+                yield SearchEvent(state, cost, len(frontier), heuristicValue=hValues[state])
+                for successor, action, stepCost in getSuccessors(state):
+                    newCost = cost + stepCost
+                    if successor in bestNode and newCost >= costs[bestNode[successor]]:
+                        stats.duplicates += 1
+                        continue
+                    bestNode[successor] = nodes.add(successor, node, action, newCost)
+                    if successor not in hValues:
+                        hValues[successor] = heuristic(successor, problem)
+                    if successor in closed:
+                        inconsistent.add(successor)
+                    else:
+                        frontier.update(successor, newCost + weight * hValues[successor])
+
+            if incumbent is None:
+                return []
+            openStates = list(frontier) + list(inconsistent)
+            lowerBound = min([costs[bestNode[state]] + hValues[state] for state in openStates] or [incumbentCost])
+            bound = min(weight, incumbentCost / lowerBound) if lowerBound > 0 else weight
+            stats.addSolution(incumbentCost, max(bound, 1.0))
+            if bound <= 1.0 or (weight == 1.0 and not inconsistent) or (deadline is not None and time.time() >= deadline):
+                return nodes.getPath(incumbent)
+
+            # Lower the weight and re-key the frontier, including the states
+            # that became inconsistent during the last pass
+            weight = max(1.0, weight - weightStep)
+            frontier = util.IndexedPriorityQueue()
+            for state in openStates:
+                frontier.push(state, costs[bestNode[state]] + weight * hValues[state])
+            inconsistent = set()
+    finally:
+        stats.finish(None)
+
+def _recordReferenceGap(problem, stats, path, reference):
+    """
+    Records path in stats.solutions with its cost relative to reference, the
+    cost of a known solution (e.g. an optimal one) or its list of actions,
+    so that stats.suboptimalityBound is cost / reference cost.
+    """
+    if reference is None or not path:
+        return
+    if isinstance(reference, list):
+        reference = problem.getCostOfActions(reference)
+    cost = problem.getCostOfActions(path)
+    stats.addSolution(cost, cost / reference if reference > 0 else 1.0)
+
+def _beamLayer(layer, nodes, visited, isGoalState, getSuccessors, heuristic, untimedHeuristic, problem, stats):
+    """
+    Expands a layer of beam nodes, yielding a SearchEvent per expansion, and
+    returns their successors that are not in visited, as (g + h, order,
+    state, parent node, action, g) tuples sorted best first, with one entry
+    per state, and the cheapest goal node among them (or None), which is
+    added to nodes.  The events compute h on first use with
+    untimedHeuristic, since the layer does not keep it.
+    """
+    costs, states = nodes.costs, nodes.states
+    children = {} # state -> entry
+    goal = None
+    for node in layer:
+        state, cost = states[node], costs[node]
+        stats.expand(state, cost, None, len(layer), len(visited))
+        yield SearchEvent(state, cost, len(layer), untimedHeuristic, problem)
+        for successor, action, stepCost in getSuccessors(state):
+            newCost = cost + stepCost
+            if successor in visited or (successor in children and children[successor][5] <= newCost):
+                stats.duplicates += 1
+                continue
+            if isGoalState(successor):
+                if goal is None or newCost < costs[goal]:
+                    goal = nodes.add(successor, node, action, newCost)
+                continue
+            if successor in children:
+                order, h = children[successor][1], children[successor][0] - children[successor][5]
+            else:
+                order, h = len(children), heuristic(successor, problem)
+            children[successor] = (newCost + h, order, successor, node, action, newCost)
+    return sorted(children.values()), goal
+
+def beamSearch(problem: SearchProblem, heuristic=nullHeuristic, beamWidth=100, reference=None,
+               stats=None) -> List[Directions]:
+    """
+    Beam search: a breadth-first search that keeps only the beamWidth
+    successors with the lowest g + h in each layer, ties going to the
+    earliest generated.  States kept in an earlier layer are not generated
+    again, so at most beamWidth * depth nodes are ever stored.  It stops at
+    the first layer that reaches a goal, returning the cheapest path to it,
+    and returns [] if the beam dies out.  The result is neither optimal nor
+    guaranteed, but costs O(beamWidth * depth) expansions.
+
+    If reference, the cost of a known solution or its list of actions, is
+    given, the cost of the plan found over it is left in
+    stats.suboptimalityBound.
+    """
+    return drainSearch(beamSearchEvents(problem, heuristic, beamWidth, reference, stats))
+
+def beamSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, beamWidth=100, reference=None,
+                     stats=None):
+    """
+    beamSearch as a generator that yields a SearchEvent per expansion and
+    returns the path.  The frontierSize of an event is the size of its
+    layer.  Closing it early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    isGoalState = stats.timeGoalTest(problem.isGoalState)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    untimedHeuristic = heuristic
+    heuristic = stats.timeHeuristic(heuristic)
+
+    try:
+        nodes = SearchNodes()
+        start = problem.getStartState()
+        if isGoalState(start):
+            return []
+        layer = [nodes.add(start)]
+        visited = set()
+        visited.add(start)
+
+        while layer:
+            children, goal = yield from _beamLayer(layer, nodes, visited, isGoalState, getSuccessors,
+                                                   heuristic, untimedHeuristic, problem, stats)
+            if goal is not None:
+                path = nodes.getPath(goal)
+                _recordReferenceGap(problem, stats, path, reference)
+                return path
+            layer = []
+            for f, order, state, parent, action, cost in children[:beamWidth]:
+                layer.append(nodes.add(state, parent, action, cost))
+                visited.add(state)
+        return []
+    finally:
+        stats.finish(None)
+
+def limitedDiscrepancySearch(problem: SearchProblem, heuristic=nullHeuristic, beamWidth=10,
+                             maxDiscrepancies=None, reference=None, stats=None) -> List[Directions]:
+    """
+    Limited discrepancy search over beams (BULB, Furcy and Koenig 2005).
+    The successors of a beam are sorted by g + h, as in beamSearch, and cut
+    into slices of beamWidth; taking the first slice follows the heuristic,
+    and taking slice i instead costs i discrepancies.  Each iteration is a
+    depth-first search over beams with a budget of discrepancies, starting
+    from 0 (plain beam search) and growing by one until a goal is found,
+    maxDiscrepancies is passed, or an iteration never runs out of budget,
+    in which case every path has been tried and [] is returned.  With
+    beamWidth 1 this is Harvey and Ginsberg's limited discrepancy search.
+
+    Only the beams on the current branch and their sorted successors are
+    stored, one of each per depth, and their states are not generated
+    again, so memory stays within beamWidth * depth nodes times the
+    branching factor.  The number of branches grows exponentially with the
+    discrepancies, so narrow beams on mazes with many dead ends can take
+    long; maxDiscrepancies caps it.  reference is handled as in beamSearch.
+    """
+    return drainSearch(limitedDiscrepancySearchEvents(problem, heuristic, beamWidth, maxDiscrepancies,
+                                                      reference, stats))
+
+def limitedDiscrepancySearchEvents(problem: SearchProblem, heuristic=nullHeuristic, beamWidth=10,
+                                   maxDiscrepancies=None, reference=None, stats=None):
+    """
+    limitedDiscrepancySearch as a generator that yields a SearchEvent per
+    expansion, in every iteration, and returns the path.  The frontierSize
+    of an event is the size of its beam.  Closing it early stops the
+    search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    isGoalState = stats.timeGoalTest(problem.isGoalState)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    untimedHeuristic = heuristic
+    heuristic = stats.timeHeuristic(heuristic)
+
+    try:
+        start = problem.getStartState()
+        if isGoalState(start):
+            return []
+        discrepancies = 0
+
+        while maxDiscrepancies is None or discrepancies <= maxDiscrepancies:
+            nodes = SearchNodes()
+            visited = set()
+            visited.add(start)
+            branch = [[[nodes.add(start)], 0, 0, None]] # [beam, next slice, discrepancies spent, successors] per depth
+            pruned = False
+            while branch:
+                beam, index, spent, children = branch[-1]
+                if children is None:
+                    children, goal = yield from _beamLayer(beam, nodes, visited, isGoalState, getSuccessors,
+                                                           heuristic, untimedHeuristic, problem, stats)
+                    if goal is not None:
+                        path = nodes.getPath(goal)
+                        _recordReferenceGap(problem, stats, path, reference)
+                        return path
+                    branch[-1][3] = children
+                chosen = children[index * beamWidth:(index + 1) * beamWidth]
+                if chosen and spent + index > discrepancies:
+                    pruned = True
+                if not chosen or spent + index > discrepancies:
+                    # Backtrack, forgetting this beam and the nodes made below it
+                    branch.pop()
+                    if branch:
+                        visited.difference_update(nodes.states[node] for node in beam)
+                        nodes.truncate(beam[0])
+                    continue
+                branch[-1][1] += 1
+                beam = []
+                for f, order, state, parent, action, cost in chosen:
+                    beam.append(nodes.add(state, parent, action, cost))
+                    visited.add(state)
+                branch.append([beam, 0, spent + index, None])
+            if not pruned:
+                break
+            discrepancies += 1
+        return []
+    finally:
+        stats.finish(None)
+
+def _jump(walls, x, y, dx, dy, goal):
+    """
+    Moves from (x,y) in direction (dx,dy), one of the four axis directions,
+    until it reaches a jump point, and returns it, or None at a wall.  A jump
+    point is the goal or a cell with a forced neighbour: an open cell beside
+    the line of travel whose cell one step back is a wall, so that the
+    shortest way there may turn at this cell.  Moving vertically, a cell is
+    also a jump point if a horizontal jump from it finds one, since
+    horizontal moves are only ever started from jump points.
+    """
+    while True:
+        if walls[x][y]:
+            return None
+        if (x, y) == goal:
+            return (x, y)
+        if dx != 0:
+            if (not walls[x][y - 1] and walls[x - dx][y - 1]) or (not walls[x][y + 1] and walls[x - dx][y + 1]):
+                return (x, y)
+        else:
+            if (not walls[x - 1][y] and walls[x - 1][y - dy]) or (not walls[x + 1][y] and walls[x + 1][y - dy]):
+                return (x, y)
+            if _jump(walls, x + 1, y, 1, 0, goal) or _jump(walls, x - 1, y, -1, 0, goal):
+                return (x, y)
+        x, y = x + dx, y + dy
+
+def _jumpDirections(walls, cell, parent):
+    """
+    The directions worth searching from a jump point: all four from the
+    start, otherwise straight on and both sides, never back towards parent.
+    """
+    x, y = cell
+    if parent is None:
+        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+    else:
+        dx = (x > parent[0]) - (x < parent[0])
+        dy = (y > parent[1]) - (y < parent[1])
+        if dx != 0:
+            directions = [(0, -1), (0, 1), (dx, 0)]
+        else:
+            directions = [(-1, 0), (1, 0), (0, dy)]
+    return [(dx, dy) for dx, dy in directions if not walls[x + dx][y + dy]]
+
+def jumpPointSearch(problem: SearchProblem, stats=None) -> List[Directions]:
+    """
+    Jump Point Search on a 4-connected grid of uniform step cost, for
+    problems with walls, a single goal and a (x,y) start state, such as
+    PositionSearchProblem; the costFn of the problem is ignored.
+
+    This is A* with the manhattan heuristic over jump points only: from each
+    jump point the search runs straight along each useful direction until
+    the next jump point (see _jump), so the many equivalent orderings of
+    moves through an open room are never expanded.  The moves between jump
+    points are filled in when the path is built.  problem._expanded counts
+    expanded jump points, to compare with aStarSearch.
+    """
+    return drainSearch(jumpPointSearchEvents(problem, stats))
+
+def jumpPointSearchEvents(problem: SearchProblem, stats=None):
+    """
+    jumpPointSearch as a generator that yields a SearchEvent per expanded
+    jump point and returns the path.  Closing it early stops the search.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+
+    try:
+        walls, start, goal = problem.walls, problem.getStartState(), problem.goal
+        manhattan = lambda cell: abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+        frontier = util.IndexedPriorityQueue()
+        frontier.push(start, manhattan(start))
+        bestCost = {start: 0}
+        parents = {start: None}
+        closed = set()
+
+        while not frontier.isEmpty():
+            cell = frontier.pop()
+            if cell == goal:
+                return _jumpPath(parents, goal)
+            closed.add(cell)
+            problem._expanded += 1
+            stats.expand(cell, bestCost[cell], manhattan(cell), len(frontier), len(closed))
+            yield SearchEvent(cell, bestCost[cell], len(frontier), heuristicValue=manhattan(cell))
+            for dx, dy in _jumpDirections(walls, cell, parents[cell]):
+                jumpPoint = _jump(walls, cell[0] + dx, cell[1] + dy, dx, dy, goal)
+                if jumpPoint is None:
+                    continue
+                stats.generated += 1
+                newCost = bestCost[cell] + abs(jumpPoint[0] - cell[0]) + abs(jumpPoint[1] - cell[1])
+                if jumpPoint in closed or (jumpPoint in bestCost and bestCost[jumpPoint] <= newCost):
+                    stats.duplicates += 1
+                    continue
+                bestCost[jumpPoint] = newCost
+                parents[jumpPoint] = cell
+                frontier.update(jumpPoint, newCost + manhattan(jumpPoint))
+        return []
+    finally:
+        stats.finish(None)
+
+def _jumpPath(parents, goal):
+    "The actions from the start to goal, through the jump points in parents."
+    path = []
+    cell = goal
+    while parents[cell] is not None:
+        parent = parents[cell]
+        dx, dy = cell[0] - parent[0], cell[1] - parent[1]
+        steps = abs(dx) + abs(dy)
+        action = Actions.vectorToDirection((dx // steps, dy // steps))
+        path.extend([action] * steps)
+        cell = parent
+    path.reverse()
+    return path
+
+# Where portfolioSearch records the configuration that won on each layout
+PORTFOLIO_RECORD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.searchPortfolio.json')
+
+_portfolio = None # (problem, configurations) of the running portfolioSearch, inherited by workers
+
+def _runPortfolioEntry(index):
+    "Runs one portfolio configuration and returns its path, expansions and stats."
+    problem, configurations = _portfolio
+    label, searchFunction, heuristic = configurations[index]
+    if heuristic is None:
+        path = searchFunction(problem)
+    else:
+        path = searchFunction(problem, heuristic)
+    return path, getattr(problem, '_expanded', None), getattr(problem, 'searchStats', None)
+
+def _portfolioWorker(index, connection):
+    """
+    Runs one portfolio configuration in a worker process and sends
+    (True, path, expanded, stats) or (False, traceback) on connection.
+    """
+    try:
+        path, expanded, stats = _runPortfolioEntry(index)
+        if stats is not None:
+            # Hooks belong to the caller's process, and may not pickle
+            stats.expansionHooks = []
+        connection.send((True, path, expanded, stats))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+def _functionKey(function):
+    "Names a function, and for a lambda hashes its code, so that the name stays the same across runs."
+    if function is None:
+        return 'None'
+    function = inspect.unwrap(function) # e.g. memoizeHeuristic wrappers
+    name = '%s.%s' % (getattr(function, '__module__', None), getattr(function, '__qualname__', type(function).__name__))
+    code = getattr(function, '__code__', None)
+    if code is not None and code.co_name == '<lambda>':
+        name += ' %08x' % zlib.crc32(code.co_code + repr(code.co_consts).encode())
+    return name
+
+def _portfolioKey(problem, heuristic):
+    """
+    Identifies the kind of problem, its layout, goal and cost function and
+    the heuristic, for PORTFOLIO_RECORD_FILE.
+    """
+    import mazeDistances
+    return '%s %s goal=%r costFn=%s heuristic=%s' % (
+        type(problem).__name__, mazeDistances.wallsHash(problem.walls), getattr(problem, 'goal', None),
+        _functionKey(getattr(problem, 'costFn', None)), _functionKey(heuristic))
+
+def _loadPortfolioRecord(recordFile):
+    try:
+        with open(recordFile) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _savePortfolioWinner(recordFile, key, label, seconds):
+    record = _loadPortfolioRecord(recordFile)
+    record[key] = {'winner': label, 'seconds': seconds}
+    temporary = '%s.%d.tmp' % (recordFile, os.getpid())
+    try:
+        with open(temporary, 'w') as f:
+            json.dump(record, f, indent=1, sort_keys=True)
+        os.replace(temporary, recordFile)
+    except OSError:
+        if os.path.exists(temporary): os.remove(temporary)
+
+def portfolioSearch(problem: SearchProblem, heuristic=nullHeuristic, configurations=None,
+                    recordFile=PORTFOLIO_RECORD_FILE, maxWorkers=None) -> List[Directions]:
+    """
+    Races several search configurations on the same problem, each in its
+    own worker process, and returns the path of the first one to succeed;
+    the other workers are then terminated.  A configuration that raises
+    or whose worker dies drops out of the race, and RuntimeError is raised
+    only if every configuration fails.  Every configuration should be
+    optimal for the problem, so that the first answer is an optimal one.
+
+    configurations is a list of (label, searchFunction, heuristic) triples;
+    searchFunction is called as searchFunction(problem) when heuristic is
+    None and as searchFunction(problem, heuristic) otherwise.  The default
+    races uniformCostSearch and aStarSearch with the given heuristic, and
+    breadthFirstSearch as well if problem.unitCosts is True, since it is
+    only optimal when every step costs the same.
+
+    The winner is recorded in recordFile (JSON), keyed by the class of the
+    problem, its walls, goal and costFn and the heuristic.  When the record
+    names one of the configurations for this key, that configuration is
+    run directly, in this process; pass recordFile=None to always race.
+    At most maxWorkers workers run at once, by default one per
+    configuration.  problem._expanded and problem.searchStats are copied
+    from the winning worker, without its expansion hooks, and
+    problem.portfolioWinner holds its label.
+
+    Workers are forked, so that they inherit the problem instead of
+    unpickling it.  Where fork is not available there is no race: only the
+    first configuration runs, in this process, and no winner is recorded.
+    """
+    global _portfolio
+    if configurations is None:
+        configurations = [('ucs', uniformCostSearch, None),
+                          ('astar ' + getattr(heuristic, '__name__', 'heuristic'), aStarSearch, heuristic)]
+        if getattr(problem, 'unitCosts', False):
+            configurations.insert(0, ('bfs', breadthFirstSearch, None))
+    key = _portfolioKey(problem, heuristic) if recordFile is not None and hasattr(problem, 'walls') else None
+    labels = [label for label, searchFunction, configurationHeuristic in configurations]
+    if key is not None:
+        winner = _loadPortfolioRecord(recordFile).get(key, {}).get('winner')
+        if winner in labels:
+            configurations = [configurations[labels.index(winner)]]
+
+    start = time.time()
+    _portfolio = (problem, configurations)
+    raced = len(configurations) > 1 and 'fork' in multiprocessing.get_all_start_methods()
+    try:
+        if not raced:
+            index = 0
+            path, expanded, stats = _runPortfolioEntry(0)
+        else:
+            index, path, expanded, stats = _racePortfolio(configurations, maxWorkers or len(configurations))
+    finally:
+        _portfolio = None
+
+    label = configurations[index][0]
+    if expanded is not None: problem._expanded = expanded
+    if stats is not None: problem.searchStats = stats
+    problem.portfolioWinner = label
+    if key is not None and raced:
+        _savePortfolioWinner(recordFile, key, label, time.time() - start)
+    return path
+
+def _racePortfolio(configurations, maxWorkers):
+    """
+    Runs the configurations of _portfolio in forked workers, at most
+    maxWorkers at a time, until one succeeds, and returns its index, path,
+    expansions and stats.  Each worker answers on its own pipe; a pipe that
+    closes without an answer means the worker died.
+    """
+    context = multiprocessing.get_context('fork')
+    waiting = list(range(len(configurations)))
+    running = {} # Receiving end of a worker's pipe -> (index, process)
+    failures = []
+    try:
+        while waiting or running:
+            while waiting and len(running) < maxWorkers:
+                index = waiting.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_portfolioWorker, args=(index, sender))
+                process.start()
+                sender.close()
+                running[receiver] = (index, process)
+            for receiver in multiprocessing.connection.wait(list(running)):
+                index, process = running.pop(receiver)
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    process.join()
+                    message = (False, 'worker exited with code %s' % process.exitcode)
+                receiver.close()
+                process.join()
+                if message[0]:
+                    return (index,) + message[1:]
+                failures.append('%s: %s' % (configurations[index][0], message[1]))
+    finally:
+        # Stop the losers
+        for receiver, (index, process) in running.items():
+            process.terminate()
+        for receiver, (index, process) in running.items():
+            process.join()
+            receiver.close()
+    raise RuntimeError('Every portfolio configuration failed:\n' + '\n'.join(failures))
+
+_hda = None # (problem, heuristic) of the running hashDistributedAStarSearch, inherited by workers
+
+def _hdaWorker(workerId, inboxes, results, batchSize, reportExpansions):
+    """
+    One worker of hashDistributedAStarSearch.  It owns the states whose hash
+    is workerId modulo the number of workers, keeps their best g, parent and
+    action, and runs A* on its own open list.  Successors owned by other
+    workers are buffered per owner and sent in batches, with their h so
+    that the owner need not compute it again.  Nodes with f at or above the
+    incumbent are dropped, and so are nodes whose g is no better than the
+    best this worker has already sent or kept for their state.
+
+    Messages in the inbox are ('nodes', [(state, g, h, parent, action), ...]),
+    ('incumbent', cost), ('probe', wave), ('parent', state) and ('stop',).
+    The worker reports ('idle', ...) when it runs out of work below the
+    incumbent, ('goal', cost, state) when it pops a goal, and answers probes
+    and parent queries on the results queue.  A goal's cost is also sent to
+    the other workers directly, so they can prune without waiting for this
+    process to broadcast it.  If reportExpansions is True, the expansions of
+    each batch are reported as ('expanded', [(state, g, h, open list size),
+    ...]).
+    """
+    try:
+        problem, heuristic = _hda
+        workers = len(inboxes)
+        inbox = inboxes[workerId]
+        openList = []   # (f, count, g, state)
+        bestCost, parents = {}, {}
+        sentCost = {}   # Best g sent to another worker, per state
+        outgoing = [[] for i in range(workers)]
+        expansions = []
+        incumbent = float('inf')
+        sent = received = expanded = generated = duplicates = count = 0
+        lastReport = None
+
+        def reach(state, cost, h, parent, action):
+            nonlocal count, duplicates
+            if cost >= bestCost.get(state, float('inf')):
+                duplicates += 1
+            elif cost + h < incumbent:
+                bestCost[state] = cost
+                parents[state] = (parent, action)
+                heapq.heappush(openList, (cost + h, count, cost, state))
+                count += 1
+
+        def flush():
+            nonlocal sent
+            for owner in range(workers):
+                if outgoing[owner]:
+                    inboxes[owner].put(('nodes', outgoing[owner]))
+                    outgoing[owner] = []
+                    sent += 1
+
+        def isIdle():
+            return not openList or openList[0][0] >= incumbent
+
+        def handle(message):
+            nonlocal received, incumbent
+            kind = message[0]
+            if kind == 'nodes':
+                received += 1
+                for node in message[1]:
+                    reach(*node)
+            elif kind == 'incumbent':
+                incumbent = min(incumbent, message[1])
+            elif kind == 'probe':
+                results.put(('probe', message[1], workerId, isIdle(), sent, received, expanded,
+                             generated, duplicates))
+            elif kind == 'parent':
+                results.put(('parent', message[1], parents[message[1]]))
+            return kind != 'stop'
+
+        while True:
+            if isIdle():
+                flush()
+                if lastReport != (sent, received):
+                    lastReport = (sent, received)
+                    results.put(('idle', workerId, sent, received))
+                if not handle(inbox.get()):
+                    return
+                continue
+            lastReport = None
+            try:
+                while True:
+                    if not handle(inbox.get_nowait()):
+                        return
+            except queue.Empty:
+                pass
+            outgoingBound = float('inf') # Lowest f buffered for another worker
+            for i in range(batchSize):
+                if isIdle() or openList[0][0] > outgoingBound:
+                    break
+                f, tieBreak, cost, state = heapq.heappop(openList)
+                if cost > bestCost[state]:
+                    continue # Superseded by a cheaper path
+                if problem.isGoalState(state):
+                    if cost < incumbent:
+                        incumbent = cost
+                        results.put(('goal', cost, state))
+                        for owner in range(workers):
+                            if owner != workerId:
+                                inboxes[owner].put(('incumbent', cost))
+                    continue
+                expanded += 1
+                if reportExpansions:
+                    expansions.append((state, cost, f - cost, len(openList)))
+                for successor, action, stepCost in problem.getSuccessors(state):
+                    generated += 1
+                    successorCost = cost + stepCost
+                    owner = hash(successor) % workers
+                    if owner == workerId:
+                        reach(successor, successorCost, heuristic(successor, problem), state, action)
+                    elif successorCost >= sentCost.get(successor, float('inf')):
+                        duplicates += 1
+                    else:
+                        h = heuristic(successor, problem)
+                        if successorCost + h < incumbent:
+                            sentCost[successor] = successorCost
+                            outgoing[owner].append((successor, successorCost, h, state, action))
+                            outgoingBound = min(outgoingBound, successorCost + h)
+            flush()
+            if expansions:
+                results.put(('expanded', expansions))
+                expansions = []
+            if outgoingBound < float('inf'):
+                os.sched_yield()
+    except Exception:
+        results.put(('error', workerId, traceback.format_exc()))
+
+def hashDistributedAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, workers=None,
+                               batchSize=64, stats=None) -> List[Directions]:
+    """
+    Hash-distributed A* (HDA*).  Each state belongs to one of workers forked
+    processes, chosen by hash(state) % workers (forked workers share the
+    hash seed), and only its owner keeps its cost and parent and expands it.
+    Generated nodes travel to their owners in batches of up to batchSize
+    expansions through multiprocessing queues.
+
+    A worker that pops a goal reports its cost, and this process broadcasts
+    the best one as the incumbent.  The search is over when every worker
+    is idle (its open list is empty or has no f below the incumbent) and
+    no batch is in flight.  This process checks that with probe waves:
+    every worker reports whether it is idle and how many batches it has
+    sent and received, and two waves in a row with every worker idle, the
+    same counts, and as many batches received as sent end the search.
+    Every node with f below the incumbent has then been expanded, so the
+    incumbent is optimal for an admissible heuristic.  The path is rebuilt
+    by asking the owner of each state on it for its parent.
+
+    problem._expanded and the expanded, generated and duplicates counts of
+    stats are the totals over the workers; a duplicate is a node dropped
+    because its g was no better than one already known.  Expansion hooks
+    of stats are called in this process, as the workers report their
+    batches.  Without fork, this falls back to aStarSearch.
+    """
+    return drainSearch(_hashDistributedAStarSearch(problem, heuristic, workers, batchSize, stats, False))
+
+def hashDistributedAStarSearchEvents(problem: SearchProblem, heuristic=nullHeuristic, workers=None,
+                                     batchSize=64, stats=None):
+    """
+    hashDistributedAStarSearch as a generator that yields a SearchEvent per
+    expansion and returns the path.  The workers report their expansions
+    with each batch, so events arrive a batch at a time, in the order each
+    worker made them but interleaved across workers, and frontierSize is
+    the size of the expanding worker's open list.  Closing it early stops
+    the workers.
+    """
+    return _hashDistributedAStarSearch(problem, heuristic, workers, batchSize, stats, True)
+
+def _hashDistributedAStarSearch(problem, heuristic, workers, batchSize, stats, events):
+    """
+    The generator behind hashDistributedAStarSearch and its Events form,
+    which yields events only if events is True.  Workers report their
+    expansions only when they are yielded or stats has expansion hooks,
+    since that costs a message per batch.
+    """
+    global _hda
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return (yield from aStarSearchEvents(problem, heuristic, stats=stats))
+    if stats is None:
+        stats = SearchStats()
+    stats.begin(problem)
+    reportExpansions = events or bool(stats.expansionHooks)
+    context = multiprocessing.get_context('fork')
+    inboxes = [context.Queue() for i in range(workers)]
+    results = context.Queue()
+    _hda = (problem, heuristic)
+    processes = [context.Process(target=_hdaWorker, args=(i, inboxes, results, batchSize, reportExpansions),
+                                 daemon=True)
+                 for i in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        start = problem.getStartState()
+        inboxes[hash(start) % workers].put(('nodes', [(start, 0, heuristic(start, problem), None, None)]))
+        idleWorkers = set()  # Workers that have reported idle at least once
+        incumbent, goal = float('inf'), None
+        wave, replies, lastWave = 0, {}, None
+        waveDue = probing = retry = False
+
+        def receive():
+            while True:
+                try:
+                    message = results.get(timeout=1.0)
+                except queue.Empty:
+                    if not all(process.is_alive() for process in processes):
+                        raise RuntimeError('A hashDistributedAStarSearch worker died')
+                    continue
+                if message[0] == 'error':
+                    raise RuntimeError('Worker %d failed:\n%s' % (message[1], message[2]))
+                return message
+
+        # The initial batch counts as sent by this process
+        while True:
+            message = receive()
+            kind = message[0]
+            if kind == 'expanded':
+                for state, cost, h, frontierSize in message[1]:
+                    stats.expand(state, cost, h, frontierSize, 0)
+                    if events:
+                        yield SearchEvent(state, cost, frontierSize, heuristicValue=h)
+            elif kind == 'goal':
+                if message[1] < incumbent:
+                    incumbent, goal = message[1], message[2]
+                    for inbox in inboxes:
+                        inbox.put(('incumbent', incumbent))
+            elif kind == 'idle':
+                # A worker only reports again after its counts change, so a
+                # failed wave is retried on the next report from anyone
+                idleWorkers.add(message[1])
+                if len(idleWorkers) == workers:
+                    if probing:
+                        retry = True
+                    else:
+                        waveDue = True
+            elif kind == 'probe' and message[1] == wave:
+                replies[message[2]] = message[3:]
+                if len(replies) == workers:
+                    idle = all(reply[0] for reply in replies.values())
+                    sent = 1 + sum(reply[1] for reply in replies.values())
+                    received = sum(reply[2] for reply in replies.values())
+                    snapshot = tuple(replies[i][:3] for i in range(workers))
+                    counts = [sum(reply[i] for reply in replies.values()) for i in (3, 4, 5)]
+                    replies, probing = {}, False
+                    if idle and sent == received:
+                        if snapshot == lastWave:
+                            break
+                        lastWave = snapshot
+                        waveDue = True # Confirm with a second wave
+                    else:
+                        lastWave = None
+                        waveDue = retry
+            if waveDue:
+                waveDue, probing, retry = False, True, False
+                wave += 1
+                for inbox in inboxes:
+                    inbox.put(('probe', wave))
+
+        path = []
+        state = goal
+        while state is not None:
+            inboxes[hash(state) % workers].put(('parent', state))
+            message = receive()
+            while message[0] != 'parent' or message[1] != state:
+                message = receive()
+            state, action = message[2]
+            if action is not None:
+                path.append(action)
+        path.reverse()
+        problem._expanded = stats.expanded = counts[0]
+        stats.generated, stats.duplicates = counts[1:]
+        return path
+    finally:
+        stats.finish(None)
+        _hda = None
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+idastar = iterativeDeepeningAStarSearch
+arastar = anytimeRepairingAStarSearch
+hdastar = hashDistributedAStarSearch
+beam = beamSearch
+lds = limitedDiscrepancySearch
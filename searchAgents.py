@@ -38,10 +38,15 @@ from typing import List, Tuple, Any
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
+from game import _popcount
 import util
+import collections
+import signal
 import time
 import search
 import pacman
+import mazeDistances
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -58,6 +63,9 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+# The share of the game's startup time limit that anytime searches may use
+STARTUP_TIME_FRACTION = 0.8
+
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -75,7 +83,8 @@ class SearchAgent(Agent):
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic',
+                 checkpoint=None, checkpointInterval='60', heuristicCache='0'):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -92,9 +101,26 @@ class SearchAgent(Agent):
                 heur = getattr(search, heuristic)
             else:
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
+            # heuristicCache > 0 memoizes the heuristic in an LRU cache of that many states
+            if int(heuristicCache) > 0:
+                heur = search.memoizeHeuristic(heur, int(heuristicCache))
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x, **options: func(x, heuristic=heur, **options)
+
+        # Anytime searches return their best plan before the startup time limit
+        if 'deadline' in func.__code__.co_varnames:
+            budget = pacman.ClassicGameRules().getMaxStartupTime(0) * STARTUP_TIME_FRACTION
+            untimedSearch = self.searchFunction
+            self.searchFunction = lambda x, **options: untimedSearch(x, deadline=time.time() + budget, **options)
+
+        # Searches that support it save their progress to the checkpoint file
+        # every checkpointInterval seconds and on SIGUSR1, and resume from it
+        if checkpoint != None and 'checkpoint' in func.__code__.co_varnames:
+            signals = [signal.SIGUSR1] if hasattr(signal, 'SIGUSR1') else []
+            uncheckpointedSearch = self.searchFunction
+            self.searchFunction = lambda x, **options: uncheckpointedSearch(
+                x, checkpoint=search.SearchCheckpoint(checkpoint, float(checkpointInterval), signals), **options)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -120,6 +146,7 @@ class SearchAgent(Agent):
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if 'searchStats' in dir(problem): print(problem.searchStats)
 
     def getAction(self, state):
         """
@@ -137,6 +164,10 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+def unitCost(position):
+    "The default costFn of PositionSearchProblem: every step costs 1."
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -148,7 +179,7 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
 
@@ -171,6 +202,11 @@ class PositionSearchProblem(search.SearchProblem):
     def getStartState(self):
         return self.startState
 
+    @property
+    def unitCosts(self):
+        "True if every step costs 1, so that breadth first search is optimal."
+        return self.costFn is unitCost
+
     def isGoalState(self, state):
         isGoal = state == self.goal
 
@@ -214,6 +250,29 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getPredecessors(self, state):
+        """
+        Returns the states from which a single action leads to state, as
+        triples (predecessor, action, stepCost), for the bidirectional
+        searches in search.py.  Counts as an expansion, like getSuccessors.
+        """
+
+        predecessors = []
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x,y = state
+            dx, dy = Actions.directionToVector(action)
+            prevx, prevy = int(x - dx), int(y - dy)
+            if not self.walls[prevx][prevy]:
+                predecessors.append( ( (prevx, prevy), action, self.costFn(state)) )
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -274,8 +333,12 @@ class CornersProblem(search.SearchProblem):
     """
     This search problem finds paths through all four corners of a layout.
 
-    You must select a suitable state space and successor function
+    A state is a single int: the index of Pacman's cell in the MazeGraph of
+    the walls (see mazeDistances.py) times 16, plus a 4-bit mask with bit i
+    set once corners[i] has been visited.  Use encodeState and decodeState to
+    convert to and from (position, mask) pairs.
     """
+    unitCosts = True # Every step costs 1
 
     def __init__(self, startingGameState: pacman.GameState):
         """
@@ -290,20 +353,37 @@ class CornersProblem(search.SearchProblem):
                 print('Warning: no food in corner ' + str(corner))
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
 
+        # cornerBits[index] is the mask bit of the corner at a cell index, and
+        # moves[index] lists (action, encoded successor without the old mask)
+        self.graph = mazeDistances.getMazeGraph(self.walls)
+        self.cornerBits = [0] * self.graph.size
+        for i, corner in enumerate(self.corners):
+            self.cornerBits[self.graph.index(corner)] |= 1 << i
+        self.moves = [tuple((action, nextIndex << 4 | self.cornerBits[nextIndex])
+                            for action, nextIndex in adjacent)
+                      for adjacent in self.graph.neighbours]
+
+    def encodeState(self, position, mask=0):
+        "Returns the int state for a position and a mask of visited corners."
+        index = self.graph.index(position)
+        return index << 4 | mask | self.cornerBits[index]
+
+    def decodeState(self, state):
+        "Returns the (position, mask of visited corners) pair of an int state."
+        return self.graph.cell(state >> 4), state & 15
+
     def getStartState(self):
         """
         Returns the start state (in your state space, not the full Pacman state
         space)
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return self.encodeState(self.startingPosition)
 
     def isGoalState(self, state: Any):
         """
         Returns whether this search state is a goal state of the problem.
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return state & 15 == 15
 
     def getSuccessors(self, state: Any):
         """
@@ -315,18 +395,8 @@ class CornersProblem(search.SearchProblem):
             state, 'action' is the action required to get there, and 'stepCost'
             is the incremental cost of expanding to that successor
         """
-
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-
+        mask = state & 15
+        successors = [(code | mask, action, 1) for action, code in self.moves[state >> 4]]
         self._expanded += 1 # DO NOT CHANGE
         return successors
 
@@ -362,7 +432,13 @@ def cornersHeuristic(state: Any, problem: CornersProblem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    return 0 # Default to trivial solution
+    # The exact cost of the remaining tour, from the CornersPatternDatabase
+    # of the layout (see mazeDistances.py), which the int state indexes
+    try:
+        table = problem.cornersTable
+    except AttributeError:
+        table = problem.cornersTable = mazeDistances.getCornersPatternDatabase(walls, corners).table
+    return table[state]
 
 
 
@@ -381,6 +457,8 @@ class FoodSearchProblem:
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
       foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
     """
+    unitCosts = True # Every step costs 1
+
     def __init__(self, startingGameState: pacman.GameState):
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
@@ -422,12 +500,221 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class BitmaskFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem with compact states, for searches that expand many
+    nodes.  A search state is a pair ( cellIndex, foodMask ) where
+      cellIndex: the index of Pacman's cell in the MazeGraph of the walls
+      foodMask:  an int with bit i set while the pellet at food[i] remains
+
+    Moving onto a cell without remaining food keeps the parent's mask, so no
+    food is copied, and the goal test is a comparison with 0.  The number of
+    pellets left in each mask is kept in foodCounts, one less than in the
+    parent's mask whenever a successor eats a pellet.  Use decodeState to
+    get a ( pacmanPosition, foodGrid ) state of the base class.
+    """
+    def __init__(self, startingGameState: pacman.GameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.graph = mazeDistances.getMazeGraph(self.walls)
+        self.food = self.start[1].asList()
+        self.foodBits = [0] * self.graph.size
+        for i, pellet in enumerate(self.food):
+            self.foodBits[self.graph.index(pellet)] = 1 << i
+        self.moves = [tuple((action, nextIndex, self.foodBits[nextIndex]) for action, nextIndex in adjacent)
+                      for adjacent in self.graph.neighbours]
+        self.startingPosition = startingGameState.getPacmanPosition()
+        self.start = (self.graph.index(self.startingPosition), (1 << len(self.food)) - 1)
+        self.foodCounts = {self.start[1]: len(self.food)} # food mask -> pellets left
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        index, mask = state
+        foodCounts = self.foodCounts
+        successors = []
+        for action, nextIndex, bit in self.moves[index]:
+            if mask & bit:
+                eaten = mask & ~bit
+                if eaten not in foodCounts:
+                    foodCounts[eaten] = self.getFoodCount(state) - 1
+                successors.append(((nextIndex, eaten), action, 1))
+            else:
+                successors.append(((nextIndex, mask), action, 1))
+        return successors
+
+    def getCostOfActions(self, actions):
+        """Returns the cost of a particular sequence of actions.  If those actions
+        include an illegal move, return 999999"""
+        x,y= self.startingPosition
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            if self.walls[x][y]:
+                return 999999
+        return len(actions)
+
+    def getRemainingFood(self, state):
+        "Returns the positions of the pellets that remain in a state."
+        mask = state[1]
+        return [pellet for i, pellet in enumerate(self.food) if mask >> i & 1]
+
+    def getFoodCount(self, state):
+        "Returns the number of pellets that remain in a state."
+        count = self.foodCounts.get(state[1])
+        if count == None: # A mask this problem did not generate
+            count = self.foodCounts[state[1]] = _popcount(state[1])
+        return count
+
+    def decodeState(self, state):
+        "Returns the ( pacmanPosition, foodGrid ) state of FoodSearchProblem."
+        foodGrid = BitGrid(self.walls.width, self.walls.height)
+        for x, y in self.getRemainingFood(state):
+            foodGrid[x][y] = True
+        return self.graph.cell(state[0]), foodGrid
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
         self.searchType = FoodSearchProblem
 
+class FoodHeuristicEngine:
+    """
+    The bookkeeping behind foodHeuristic, kept in problem.heuristicInfo so
+    that it is built once per problem rather than at every node.
+
+    Pellets are numbered in the order of the starting food list, and a set of
+    remaining pellets is an int mask with bit i set while food[i] remains.
+    The engine holds a maze distance field from every pellet to every cell,
+    so the pairwise food distance matrix and the distance from Pacman to each
+    pellet are single lookups.  Minimum spanning trees of the remaining food
+    are cached by mask, with their edges, in an LRU cache of cacheSize
+    entries.  A tree missing from the cache is derived from the tree of the
+    same food plus the pellet under Pacman, if that one is cached, which is
+    the case for a successor that has just eaten it: removing a vertex from
+    a minimum spanning tree leaves a forest whose edges stay in the new tree,
+    and only the cheapest edges that reconnect its components are added.
+
+    hits, misses, incrementalUpdates and evictions count cache lookups.
+    """
+
+    def __init__(self, walls, food, cacheSize=16384):
+        self.graph = mazeDistances.getMazeGraph(walls)
+        self.food = list(food)
+        self.foodCells = [self.graph.index(pellet) for pellet in self.food]
+        self.foodAtCell = dict((cell, i) for i, cell in enumerate(self.foodCells))
+        # fields[i][cell] is the maze distance from food[i], 0 if unreachable
+        self.fields = [[max(distance, 0) for distance in mazeDistances.DistanceField(walls, [pellet]).distances]
+                       for pellet in self.food]
+        self.distances = [[field[cell] for cell in self.foodCells] for field in self.fields]
+        self.cacheSize = cacheSize
+        self.trees = collections.OrderedDict() # mask -> (weight, edges), least recently used first
+        self.hits = self.misses = self.incrementalUpdates = self.evictions = 0
+
+    def foodMask(self, foodGrid):
+        "The mask of the pellets left in a food Grid (or BitGrid, or a mask already)."
+        if isinstance(foodGrid, int):
+            return foodGrid
+        mask = 0
+        if isinstance(foodGrid, BitGrid):
+            bits = foodGrid.bits
+            for i, cell in enumerate(self.foodCells):
+                if bits >> cell & 1: mask |= 1 << i
+        else:
+            for i, (x, y) in enumerate(self.food):
+                if foodGrid[x][y]: mask |= 1 << i
+        return mask
+
+    def _spanningTree(self, pellets):
+        "Prim's algorithm over the food distance matrix; returns (weight, edges)."
+        distances = self.distances
+        first, rest = pellets[0], pellets[1:]
+        best = dict((i, (distances[first][i], first)) for i in rest)
+        weight, edges = 0, []
+        while best:
+            i = min(best, key=lambda i: best[i][0])
+            distance, parent = best.pop(i)
+            weight += distance
+            edges.append((parent, i))
+            row = distances[i]
+            for j, (old, oldParent) in best.items():
+                if row[j] < old:
+                    best[j] = (row[j], i)
+        return weight, edges
+
+    def _removePellet(self, tree, removed, pellets):
+        "The minimum spanning tree of pellets, from tree, which also spans the removed pellet."
+        distances = self.distances
+        edges = [(i, j) for i, j in tree[1] if i != removed and j != removed]
+        component = dict((i, i) for i in pellets)
+        def find(i):
+            while component[i] != i:
+                component[i] = component[component[i]]
+                i = component[i]
+            return i
+        for i, j in edges:
+            component[find(i)] = find(j)
+        # The cheapest edge between each pair of components, joined Kruskal style
+        crossing = {}
+        for a, i in enumerate(pellets):
+            rootI, row = find(i), distances[i]
+            for j in pellets[a + 1:]:
+                rootJ = find(j)
+                if rootI != rootJ:
+                    key = (rootI, rootJ) if rootI < rootJ else (rootJ, rootI)
+                    if key not in crossing or row[j] < crossing[key][0]:
+                        crossing[key] = (row[j], i, j)
+        for distance, i, j in sorted(crossing.values()):
+            rootI, rootJ = find(i), find(j)
+            if rootI != rootJ:
+                component[rootI] = rootJ
+                edges.append((i, j))
+        weight = sum(distances[i][j] for i, j in edges)
+        return weight, edges
+
+    def spanningTreeWeight(self, mask, eaten=None):
+        """
+        The weight of the minimum spanning tree of the pellets in mask.  eaten
+        is the pellet that may just have been removed from a cached set.
+        """
+        trees = self.trees
+        tree = trees.get(mask)
+        if tree != None:
+            self.hits += 1
+            trees.move_to_end(mask)
+            return tree[0]
+        self.misses += 1
+        pellets = [i for i in range(len(self.food)) if mask >> i & 1]
+        parent = None if eaten == None else trees.get(mask | 1 << eaten)
+        if not pellets:
+            tree = (0, [])
+        elif parent != None:
+            self.incrementalUpdates += 1
+            tree = self._removePellet(parent, eaten, pellets)
+        else:
+            tree = self._spanningTree(pellets)
+        trees[mask] = tree
+        if len(trees) > self.cacheSize:
+            trees.popitem(last=False)
+            self.evictions += 1
+        return tree[0]
+
+    def getValue(self, cell, mask):
+        """
+        The maze distance from a cell index to the closest remaining pellet
+        plus the weight of the spanning tree of the remaining pellets.  Every
+        plan walks to some pellet first and then links all of them, so this
+        is admissible.
+        """
+        if mask == 0:
+            return 0
+        nearest = min(field[cell] for i, field in enumerate(self.fields) if mask >> i & 1)
+        eaten = self.foodAtCell.get(cell)
+        return nearest + self.spanningTreeWeight(mask, eaten)
+
 def foodHeuristic(state: Tuple[Tuple, List[List]], problem: FoodSearchProblem):
     """
     Your heuristic for the FoodSearchProblem goes here.
@@ -453,13 +740,21 @@ def foodHeuristic(state: Tuple[Tuple, List[List]], problem: FoodSearchProblem):
     """
     position, foodGrid = state
     "*** YOUR CODE HERE ***"
-    return 0
+    engine = problem.heuristicInfo.get('foodEngine')
+    if engine == None:
+        # BitmaskFoodSearchProblem numbers its pellets already
+        food = getattr(problem, 'food', None)
+        if food == None: food = problem.getStartState()[1].asList()
+        engine = problem.heuristicInfo['foodEngine'] = FoodHeuristicEngine(problem.walls, food)
+    cell = position if isinstance(position, int) else engine.graph.index(position)
+    return engine.getValue(cell, engine.foodMask(foodGrid))
 
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
+        self.foodField = None
         currentState = state
         while(currentState.getFood().count() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
@@ -477,15 +772,28 @@ class ClosestDotSearchAgent(SearchAgent):
         """
         Returns a path (a list of actions) to the closest dot, starting from
         gameState.
+
+        The path is read from a DistanceField flooded from every dot at once.
+        The field is kept between calls and only the dots eaten since the
+        last call are removed from it, so the sequence of searches done by
+        registerInitialState costs little more than a single flood.
         """
         # Here are some useful elements of the startState
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        # Following a path from the field eats exactly one dot: the closest
+        # one, which is the last target.  Anything else needs a new field.
+        field = getattr(self, 'foodField', None)
+        if field != None and field.walls is walls and len(field.sources) == food.count() + 1:
+            x, y = self.foodFieldTarget
+            if not food[x][y]: field.removeSource((x, y))
+        if field == None or field.walls is not walls or len(field.sources) != food.count():
+            field = mazeDistances.DistanceField(walls, food.asList())
+        self.foodField = field
+        self.foodFieldTarget = field.getSource(startPosition)
+        return field.getPathFrom(startPosition)
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -510,7 +818,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state: Tuple[int, int]):
@@ -519,15 +827,14 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         complete the problem definition.
         """
         x,y = state
-
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        return self.food[x][y]
 
 def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pacman.GameState) -> int:
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points, looked up in the
+    all-pairs DistanceOracle of the layout (see mazeDistances.py), which is
+    computed once per layout and cached on disk. The gameState can be any game
+    state -- Pacman's position in that state is ignored.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -538,5 +845,4 @@ def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pa
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return mazeDistances.getDistanceOracle(walls).getDistance(point1, point2)
@@ -0,0 +1,639 @@
+# searchBenchmarks.py
+# -------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Micro-benchmarks for the data structures in util.py and the search algorithms
+in search.py.  Every benchmark runs on layouts from the layouts/ directory and
+prints one line per layout and configuration.  For example:
+
+> python searchBenchmarks.py -b queues -l bigMaze,openMaze -r 5
+
+Run with --help to list the available benchmarks.
+"""
+
+import optparse
+import time
+import tracemalloc
+import game
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+def loadGameState(layoutName):
+    "Returns the initial GameState for a layout in the layouts/ directory."
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception('The layout ' + layoutName + ' cannot be found')
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    return state
+
+def positionProblem(gameState):
+    """
+    Returns a PositionSearchProblem from Pacman's position to the food on a
+    single-dot maze, or to the open cell furthest from Pacman otherwise.
+    """
+    food = gameState.getFood().asList()
+    if len(food) == 1:
+        goal = food[0]
+    else:
+        start = gameState.getPacmanPosition()
+        goal = max(gameState.getWalls().asList(False), key=lambda cell: util.manhattanDistance(cell, start))
+    return searchAgents.PositionSearchProblem(gameState, goal=goal, warn=False, visualize=False)
+
+def bestTime(function, repeats):
+    "Runs function repeats times and returns (best wall-clock time, last result)."
+    best, result = None, None
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+    return best, result
+
+def printRow(layoutName, label, seconds, expanded, extra=''):
+    print('%-16s %-30s %9.2f ms %9d expanded %s' % (layoutName, label, seconds * 1000, expanded, extra))
+
+def problemFor(layoutName, gameState):
+    """
+    Returns (problem, heuristic) for a layout: a CornersProblem for the
+    corners mazes, a FoodSearchProblem for the food search layouts and a
+    positionProblem otherwise, each with its heuristic from searchAgents.
+    """
+    if 'Corners' in layoutName:
+        return searchAgents.CornersProblem(gameState), searchAgents.cornersHeuristic
+    if 'Search' in layoutName:
+        return searchAgents.FoodSearchProblem(gameState), searchAgents.foodHeuristic
+    return positionProblem(gameState), searchAgents.manhattanHeuristic
+
+def benchmarkQueues(layoutNames, repeats):
+    """
+    Uniform cost search and A* with util.PriorityQueue, whose update is a
+    linear scan plus heapify, against util.IndexedPriorityQueue in its
+    indexed and lazy-deletion modes and the integer queues util.BucketQueue
+    and util.RadixHeap.  The problem and heuristic depend on the layout, as
+    in problemFor.
+    """
+    queues = [('PriorityQueue', util.PriorityQueue),
+              ('IndexedPriorityQueue', util.IndexedPriorityQueue),
+              ('IndexedPriorityQueue(lazy)', lambda: util.IndexedPriorityQueue(lazy=True)),
+              ('BucketQueue', util.BucketQueue),
+              ('RadixHeap', util.RadixHeap)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for searchName in ['ucs', 'astar']:
+            for queueName, queueClass in queues:
+                def run():
+                    problem, heuristic = problemFor(layoutName, gameState)
+                    if searchName == 'ucs': heuristic = search.nullHeuristic
+                    path = search.bestFirstSearch(problem, heuristic, frontier=queueClass())
+                    return problem, path
+                seconds, (problem, path) = bestTime(run, repeats)
+                printRow(layoutName, searchName + ' ' + queueName, seconds, problem._expanded, 'cost %d' % len(path))
+
+class RecordingQueue(util.IndexedPriorityQueue):
+    "A lazy IndexedPriorityQueue that records its push, update and pop calls in ops."
+    def __init__(self):
+        util.IndexedPriorityQueue.__init__(self, lazy=True)
+        self.ops = []
+
+    def push(self, item, priority):
+        self.ops.append((True, item, priority))
+        util.IndexedPriorityQueue.push(self, item, priority)
+
+    def update(self, item, priority):
+        self.ops.append((True, item, priority))
+        util.IndexedPriorityQueue.update(self, item, priority)
+
+    def pop(self):
+        self.ops.append((False, None, None))
+        return util.IndexedPriorityQueue.pop(self)
+
+def benchmarkQueueOps(layoutNames, repeats):
+    """
+    The queue operations of uniform cost search on a layout, recorded once
+    and replayed on util.IndexedPriorityQueue in lazy mode, util.BucketQueue
+    and util.RadixHeap, so that only the queues are timed.  The frontiers
+    of these searches hold a few hundred to a few thousand states, where
+    heapq's O(log n) in C costs less than the bucket bookkeeping in Python.
+    """
+    queues = [('IndexedPriorityQueue(lazy)', lambda: util.IndexedPriorityQueue(lazy=True)),
+              ('BucketQueue', util.BucketQueue),
+              ('RadixHeap', util.RadixHeap)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        problem, heuristic = problemFor(layoutName, gameState)
+        recorder = RecordingQueue()
+        search.bestFirstSearch(problem, search.nullHeuristic, frontier=recorder)
+        ops = recorder.ops
+        for queueName, queueClass in queues:
+            def replay():
+                queue = queueClass()
+                push, pop = queue.update, queue.pop
+                for isPush, item, priority in ops:
+                    if isPush:
+                        push(item, priority)
+                    else:
+                        pop()
+            seconds, result = bestTime(replay, repeats)
+            printRow(layoutName, 'ucs ops ' + queueName, seconds, problem._expanded,
+                     '%d ops, %8.0f ops/s' % (len(ops), len(ops) / seconds))
+
+def benchmarkFifo(layoutNames, repeats):
+    """
+    Breadth first search with the list-backed util.Queue against the
+    deque-backed util.DequeQueue, reported as expansions per second.
+    """
+    queues = [('Queue', util.Queue), ('DequeQueue', util.DequeQueue)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for queueName, queueClass in queues:
+            def run():
+                problem = positionProblem(gameState)
+                path = search.breadthFirstSearch(problem, frontier=queueClass())
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, 'bfs ' + queueName, seconds, problem._expanded,
+                     '%8.0f nodes/s' % (problem._expanded / seconds))
+
+def benchmarkFoodGrid(layoutNames, repeats):
+    """
+    Uniform cost search on FoodSearchProblem with the food stored in a
+    list-backed game.Grid and in a game.BitGrid, and on
+    BitmaskFoodSearchProblem, whose states are (cell index, food mask) pairs.
+    The food grid is copied and hashed for every generated state, so the
+    first two are dominated by the grid.
+    """
+    def gridProblem(convert):
+        def makeProblem(gameState):
+            problem = searchAgents.FoodSearchProblem(gameState)
+            position, food = problem.start
+            problem.start = (position, convert(food))
+            return problem
+        return makeProblem
+    problems = [('Grid', gridProblem(lambda food: food.toGrid() if isinstance(food, game.BitGrid) else food.copy())),
+                ('BitGrid', gridProblem(lambda food: food.copy() if isinstance(food, game.BitGrid) else game.BitGrid.fromGrid(food))),
+                ('bitmask state', searchAgents.BitmaskFoodSearchProblem)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, makeProblem in problems:
+            def run():
+                problem = makeProblem(gameState)
+                path = search.uniformCostSearch(problem)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, 'ucs food ' + label, seconds, problem._expanded, 'cost %d' % len(path))
+
+class ReparsingLayout(layout.Layout):
+    "A Layout that is copied by re-parsing its text, as every Layout used to be."
+    def deepCopy(self):
+        return ReparsingLayout(self.layoutText[:])
+
+def benchmarkTurns(layoutNames, repeats):
+    """
+    Plays one game per layout with a LeftTurnAgent against random ghosts and
+    reports turns per second, with the shared immutable Layout against a
+    layout that is re-parsed on every GameState.deepCopy.
+    """
+    import pacmanAgents, ghostAgents, textDisplay, random
+    layouts = [('re-parsed layout', lambda lay: ReparsingLayout(lay.layoutText[:])),
+               ('shared layout', lambda lay: lay)]
+    for layoutName in layoutNames:
+        lay = layout.getLayout(layoutName)
+        for label, makeLayout in layouts:
+            def run():
+                random.seed(layoutName)
+                rules = pacman.ClassicGameRules()
+                ghosts = [ghostAgents.RandomGhost(i + 1) for i in range(lay.getNumGhosts())]
+                game = rules.newGame(makeLayout(lay), pacmanAgents.LeftTurnAgent(), ghosts,
+                                     textDisplay.NullGraphics(), quiet=True)
+                game.run()
+                return game
+            seconds, game = bestTime(run, repeats)
+            turns = len(game.moveHistory)
+            print('%-16s %-30s %9.2f ms %9d turns %8.0f turns/s' % (layoutName, label, seconds * 1000, turns, turns / seconds))
+
+class SearchingClosestDotAgent(searchAgents.ClosestDotSearchAgent):
+    "A ClosestDotSearchAgent that runs a new BFS on an AnyFoodSearchProblem for every dot."
+    def __init__(self):
+        pass
+
+    def findPathToClosestDot(self, gameState):
+        return search.breadthFirstSearch(searchAgents.AnyFoodSearchProblem(gameState))
+
+def benchmarkClosestDot(layoutNames, repeats):
+    """
+    The full ClosestDotSearchAgent plan, with one breadth first search per
+    dot against the incrementally repaired DistanceField.  Reports the time
+    spent in findPathToClosestDot, leaving out the game state updates that
+    registerInitialState makes between paths.
+    """
+    class FieldClosestDotAgent(searchAgents.ClosestDotSearchAgent):
+        def __init__(self):
+            pass
+    agents = [('bfs per dot', SearchingClosestDotAgent), ('distance field', FieldClosestDotAgent)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, agentClass in agents:
+            def run():
+                agent = agentClass()
+                planning = [0.0]
+                findPath = agent.findPathToClosestDot
+                def timedFindPath(state):
+                    start = time.perf_counter()
+                    path = findPath(state)
+                    planning[0] += time.perf_counter() - start
+                    return path
+                agent.findPathToClosestDot = timedFindPath
+                util.mutePrint()
+                try: agent.registerInitialState(gameState)
+                finally: util.unmutePrint()
+                return planning[0], agent
+            best = None
+            for i in range(repeats):
+                seconds, agent = run()
+                if best == None or seconds < best: best = seconds
+            print('%-16s %-30s %9.2f ms %9d moves' % (layoutName, label, best * 1000, len(agent.actions)))
+
+def benchmarkMazeDistance(layoutNames, repeats):
+    """
+    searchAgents.mazeDistance between random pairs of open cells, with one
+    breadth first search per pair against the all-pairs DistanceOracle.  The
+    oracle is built (or loaded from its cache file) before timing starts.
+    """
+    import random, mazeDistances
+    def searchDistance(point1, point2, gameState):
+        problem = searchAgents.PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
+        return len(search.breadthFirstSearch(problem))
+    methods = [('bfs per pair', searchDistance), ('distance oracle', searchAgents.mazeDistance)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        mazeDistances.getDistanceOracle(gameState.getWalls())
+        random.seed(layoutName)
+        cells = gameState.getWalls().asList(False)
+        pairs = [(random.choice(cells), random.choice(cells)) for i in range(200)]
+        for label, distance in methods:
+            seconds, total = bestTime(lambda: sum(distance(a, b, gameState) for a, b in pairs), repeats)
+            print('%-16s %-30s %9.2f ms %9d pairs %8.0f pairs/s' % (layoutName, label, seconds * 1000, len(pairs), len(pairs) / seconds))
+
+class TupleCornersProblem(searchAgents.CornersProblem):
+    "A CornersProblem with (position, tuple of visited corners) states."
+
+    def getStartState(self):
+        position = self.startingPosition
+        return (position, tuple(corner == position for corner in self.corners))
+
+    def isGoalState(self, state):
+        return all(state[1])
+
+    def getSuccessors(self, state):
+        successors = []
+        (x, y), visited = state
+        for action in [game.Directions.NORTH, game.Directions.SOUTH, game.Directions.EAST, game.Directions.WEST]:
+            dx, dy = game.Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                position = (nextx, nexty)
+                nextVisited = tuple(seen or corner == position for corner, seen in zip(self.corners, visited))
+                successors.append(((position, nextVisited), action, 1))
+        self._expanded += 1
+        return successors
+
+def benchmarkCorners(layoutNames, repeats):
+    """
+    A* (null heuristic) on CornersProblem with tuple states against the int
+    states of searchAgents.CornersProblem, and then with cornersHeuristic and
+    its pattern database, reporting time and the peak memory allocated
+    during the search (from tracemalloc, in a separate run).  The pattern
+    database is built before timing starts.
+    """
+    problems = [('tuple states', TupleCornersProblem, search.nullHeuristic),
+                ('int states', searchAgents.CornersProblem, search.nullHeuristic),
+                ('pattern database', searchAgents.CornersProblem, searchAgents.cornersHeuristic)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, problemClass, heuristic in problems:
+            def run():
+                problem = problemClass(gameState)
+                path = search.aStarSearch(problem, heuristic)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            printRow(layoutName, 'astar corners ' + label, seconds, problem._expanded,
+                     'cost %d, peak %.1f MB' % (len(path), peak / 1e6))
+
+def benchmarkBidirectional(layoutNames, repeats):
+    """
+    Breadth first search and A* (manhattan) against their bidirectional
+    versions on a PositionSearchProblem.  Expanded counts include the
+    backward expansions made through getPredecessors.
+    """
+    searches = [('bfs', search.breadthFirstSearch),
+                ('bidirectional bfs', search.bidirectionalBreadthFirstSearch),
+                ('astar', lambda problem: search.aStarSearch(problem, searchAgents.manhattanHeuristic)),
+                ('bidirectional astar', lambda problem: search.bidirectionalAStarSearch(problem, searchAgents.manhattanHeuristic))]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, searchFunction in searches:
+            def run():
+                problem = positionProblem(gameState)
+                path = searchFunction(problem)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, label, seconds, problem._expanded, 'cost %d' % len(path))
+
+def benchmarkJumpPoint(layoutNames, repeats):
+    """
+    A* (manhattan) against Jump Point Search on a PositionSearchProblem.
+    For Jump Point Search, expanded counts jump points.
+    """
+    searches = [('astar', lambda problem: search.aStarSearch(problem, searchAgents.manhattanHeuristic)),
+                ('jump point search', search.jumpPointSearch)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, searchFunction in searches:
+            def run():
+                problem = positionProblem(gameState)
+                path = searchFunction(problem)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, label, seconds, problem._expanded, 'cost %d' % len(path))
+
+def benchmarkIterativeDeepening(layoutNames, repeats):
+    """
+    A* against IDA* on FoodSearchProblem with foodHeuristic, reporting time
+    and the peak memory allocated during the search (from tracemalloc, in
+    a separate run).  IDA* expands states again on every iteration, so it
+    expands more, but its memory is bounded by its transposition table.
+    """
+    searches = [('astar', search.aStarSearch), ('idastar', search.iterativeDeepeningAStarSearch)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, searchFunction in searches:
+            def run():
+                problem = searchAgents.FoodSearchProblem(gameState)
+                path = searchFunction(problem, searchAgents.foodHeuristic)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            printRow(layoutName, label + ' food', seconds, problem._expanded,
+                     'cost %d, peak %.1f MB' % (len(path), peak / 1e6))
+
+def benchmarkAnytime(layoutNames, repeats):
+    """
+    The plans ARA* finds on CornersProblem with cornersHeuristic and on
+    FoodSearchProblem with foodHeuristic, as they improve, against A*.
+    """
+    problems = [('corners', searchAgents.CornersProblem, searchAgents.cornersHeuristic),
+                ('food', searchAgents.FoodSearchProblem, searchAgents.foodHeuristic)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, problemClass, heuristic in problems:
+            def run():
+                problem = problemClass(gameState)
+                path = search.aStarSearch(problem, heuristic)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, 'astar ' + label, seconds, problem._expanded, 'cost %d' % len(path))
+            problem = problemClass(gameState)
+            search.anytimeRepairingAStarSearch(problem, heuristic)
+            for seconds, cost, bound in problem.searchStats.solutions:
+                print('%-16s %-30s %9.2f ms %9s          cost %d, within %.3f of optimal' %
+                      (layoutName, 'arastar ' + label, seconds * 1000, '', cost, bound))
+
+def benchmarkReplanning(layoutNames, repeats):
+    """
+    Pacman eats every pellet, always heading for the closest one, while a
+    cell on its way is blocked (as by a ghost) every third pellet and freed
+    again one pellet later.  One mazeDistances.DStarLite object repairs its
+    search after each change; the fresh planner builds a new DStarLite for
+    every plan, which amounts to an A* search from the food.
+    """
+    import mazeDistances
+    def eatAll(gameState, planner):
+        walls, food = gameState.getWalls(), gameState.getFood().asList()
+        position = gameState.getPacmanPosition()
+        remaining, blocked, expanded, moves = set(food), None, 0, 0
+        incremental = mazeDistances.DStarLite(walls, remaining, position)
+        while remaining:
+            path, expandedNow = planner(incremental, walls, remaining, position, blocked)
+            expanded += expandedNow
+            if path == None and blocked != None:
+                # Walled in by the blocked cell: free it and plan again
+                incremental.setBlocked(blocked, False)
+                blocked = None
+                continue
+            if not path: break
+            for action in path:
+                dx, dy = game.Actions.directionToVector(action)
+                position = (int(position[0] + dx), int(position[1] + dy))
+            moves += len(path)
+            remaining.discard(position)
+            incremental.setStart(position)
+            incremental.removeGoal(position)
+            if blocked != None:
+                incremental.setBlocked(blocked, False)
+                blocked = None
+            elif len(remaining) % 3 == 0 and len(path) > 2:
+                # Block the cell Pacman came through two moves before the pellet
+                dx, dy = game.Actions.directionToVector(path[-2])
+                blocked = (int(position[0] - dx), int(position[1] - dy))
+                incremental.setBlocked(blocked)
+        return expanded, moves, len(remaining)
+    def incrementalPlan(incremental, walls, remaining, position, blocked):
+        before = incremental.expanded
+        path = incremental.getPath()
+        return path, incremental.expanded - before
+    def freshPlan(incremental, walls, remaining, position, blocked):
+        planner = mazeDistances.DStarLite(walls, remaining, position)
+        if blocked != None: planner.setBlocked(blocked)
+        return planner.getPath(), planner.expanded
+    planners = [('fresh search per pellet', freshPlan), ('D* Lite repair', incrementalPlan)]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, planner in planners:
+            seconds, (expanded, moves, left) = bestTime(lambda: eatAll(gameState, planner), repeats)
+            print('%-16s %-30s %9.2f ms %9d expanded %d moves, %d pellets left' % (layoutName, label, seconds * 1000, expanded, moves, left))
+
+def benchmarkPortfolio(layoutNames, repeats):
+    """
+    Each configuration of search.portfolioSearch on its own, then the
+    portfolio race (without the winner record) and the winner it reports.
+    The race only pays off with a core per configuration; on fewer cores
+    the workers share them and the fork costs are added.
+    """
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        problem, heuristic = problemFor(layoutName, gameState)
+        configurations = [('bfs', search.breadthFirstSearch, None),
+                          ('ucs', search.uniformCostSearch, None),
+                          ('astar', search.aStarSearch, heuristic)]
+        for label, searchFunction, configurationHeuristic in configurations:
+            def run():
+                problem, heuristic = problemFor(layoutName, gameState)
+                path = searchFunction(problem) if configurationHeuristic is None else searchFunction(problem, heuristic)
+                return problem, path
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, label, seconds, problem._expanded, 'cost %d' % len(path))
+        def race():
+            problem, heuristic = problemFor(layoutName, gameState)
+            path = search.portfolioSearch(problem, heuristic, configurations, recordFile=None)
+            return problem, path
+        seconds, (problem, path) = bestTime(race, repeats)
+        printRow(layoutName, 'portfolio', seconds, problem._expanded,
+                 'cost %d, won by %s' % (len(path), problem.portfolioWinner))
+
+def benchmarkDistributed(layoutNames, repeats):
+    """
+    aStarSearch against search.hashDistributedAStarSearch with 1, 2 and 4
+    workers.  Expansions grow a little with more workers, since a worker
+    can expand a node before a cheaper path to it or the incumbent
+    arrives.  Speedups need a core per worker; on fewer cores this
+    measures the messaging cost.
+    """
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        def run():
+            problem, heuristic = problemFor(layoutName, gameState)
+            return problem, search.aStarSearch(problem, heuristic)
+        seconds, (problem, path) = bestTime(run, repeats)
+        printRow(layoutName, 'astar', seconds, problem._expanded, 'cost %d' % len(path))
+        for workers in (1, 2, 4):
+            def run():
+                problem, heuristic = problemFor(layoutName, gameState)
+                return problem, search.hashDistributedAStarSearch(problem, heuristic, workers=workers)
+            seconds, (problem, path) = bestTime(run, repeats)
+            printRow(layoutName, 'hda* x%d' % workers, seconds, problem._expanded, 'cost %d' % len(path))
+
+def benchmarkBeam(layoutNames, repeats):
+    """
+    aStarSearch against search.beamSearch and search.limitedDiscrepancySearch
+    at a few beam widths, with the cost of each plan over the A* optimum.
+    """
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        def run():
+            problem, heuristic = problemFor(layoutName, gameState)
+            return problem, search.aStarSearch(problem, heuristic)
+        seconds, (problem, optimal) = bestTime(run, repeats)
+        printRow(layoutName, 'astar', seconds, problem._expanded, 'cost %d' % len(optimal))
+        for label, searchFunction in (('beam', search.beamSearch), ('lds', search.limitedDiscrepancySearch)):
+            for beamWidth in (3, 10, 100):
+                def run():
+                    problem, heuristic = problemFor(layoutName, gameState)
+                    return problem, searchFunction(problem, heuristic, beamWidth=beamWidth, reference=optimal)
+                seconds, (problem, path) = bestTime(run, repeats)
+                if path:
+                    extra = 'cost %d, %.2fx optimal' % (len(path), problem.searchStats.suboptimalityBound)
+                else:
+                    extra = 'no plan'
+                printRow(layoutName, '%s width %d' % (label, beamWidth), seconds, problem._expanded, extra)
+
+def benchmarkFoodHeuristic(layoutNames, repeats):
+    """
+    aStarSearch with searchAgents.foodHeuristic on FoodSearchProblem, with
+    the spanning tree cache of its FoodHeuristicEngine switched off (every
+    tree computed with Prim's algorithm) and on (cached by food mask and
+    updated incrementally when a pellet is eaten).
+    """
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, cacheSize in (('no tree cache', 0), ('tree cache', 16384)):
+            def run():
+                problem = searchAgents.FoodSearchProblem(gameState)
+                food = problem.getStartState()[1].asList()
+                problem.heuristicInfo['foodEngine'] = searchAgents.FoodHeuristicEngine(problem.walls, food, cacheSize)
+                return problem, search.aStarSearch(problem, searchAgents.foodHeuristic)
+            seconds, (problem, path) = bestTime(run, repeats)
+            engine = problem.heuristicInfo['foodEngine']
+            printRow(layoutName, 'astar ' + label, seconds, problem._expanded,
+                     'cost %d, %d hits, %d misses, %d incremental' %
+                     (len(path), engine.hits, engine.misses, engine.incrementalUpdates))
+
+def benchmarkHeuristicCache(layoutNames, repeats):
+    """
+    Searches with their heuristic as is and wrapped by
+    search.memoizeHeuristic, with the cache hits and misses they report.
+    """
+    searches = [('astar', search.aStarSearch, {}),
+                ('lds width 3', search.limitedDiscrepancySearch, {'beamWidth': 3}),
+                ('idastar', search.iterativeDeepeningAStarSearch, {}),
+                ('arastar', search.anytimeRepairingAStarSearch, {})]
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for label, searchFunction, options in searches:
+            for memoized in (False, True):
+                def run():
+                    problem, heuristic = problemFor(layoutName, gameState)
+                    if memoized:
+                        heuristic = search.memoizeHeuristic(heuristic)
+                    return problem, searchFunction(problem, heuristic, **options)
+                seconds, (problem, path) = bestTime(run, repeats)
+                stats = problem.searchStats
+                extra = 'cost %d' % len(path)
+                if memoized:
+                    extra += ', %d hits, %d misses' % (stats.heuristicCacheHits, stats.heuristicCacheMisses)
+                printRow(layoutName, label + (' memoized' if memoized else ''), seconds, problem._expanded, extra)
+
+BENCHMARKS = {
+    'anytime': (benchmarkAnytime, 'mediumCorners,tinySearch'),
+    'beam': (benchmarkBeam, 'bigMaze,mediumCorners,tinySearch,trickySearch'),
+    'bidirectional': (benchmarkBidirectional, 'mediumMaze,bigMaze,openMaze,bigSearch'),
+    'closestdot': (benchmarkClosestDot, 'mediumSearch,bigSearch,openSearch'),
+    'distributed': (benchmarkDistributed, 'bigMaze,mediumCorners,tinySearch'),
+    'foodgrid': (benchmarkFoodGrid, 'testSearch,tinySearch,trickySearch'),
+    'foodheuristic': (benchmarkFoodHeuristic, 'tinySearch,smallSearch,trickySearch,greedySearch'),
+    'corners': (benchmarkCorners, 'mediumCorners,bigCorners'),
+    'fifo': (benchmarkFifo, 'mediumMaze,bigMaze,openMaze,bigSearch'),
+    'heuristiccache': (benchmarkHeuristicCache, 'openMaze,bigMaze,tinySearch,trickySearch'),
+    'idastar': (benchmarkIterativeDeepening, 'testSearch,tinySearch'),
+    'jps': (benchmarkJumpPoint, 'mediumMaze,bigMaze,openMaze,openSearch,bigSearch'),
+    'mazedistance': (benchmarkMazeDistance, 'mediumMaze,bigMaze,bigSearch'),
+    'portfolio': (benchmarkPortfolio, 'bigMaze,mediumCorners,tinySearch'),
+    'queueops': (benchmarkQueueOps, 'bigMaze,bigCorners,trickySearch'),
+    'queues': (benchmarkQueues, 'mediumMaze,bigMaze,mediumCorners,bigCorners,tinySearch'),
+    'replanning': (benchmarkReplanning, 'mediumSearch,bigSearch,mediumClassic'),
+    'turns': (benchmarkTurns, 'mediumClassic,originalClassic,trickyClassic'),
+}
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description = 'Benchmark the search data structures and algorithms')
+    parser.add_option('-b', '--benchmark', dest = 'benchmark', default = ','.join(sorted(BENCHMARKS.keys())),
+                      help = 'comma separated benchmarks to run, from: %s [Default: all]' % ', '.join(sorted(BENCHMARKS.keys())))
+    parser.add_option('-l', '--layouts', dest = 'layouts', default = None,
+                      help = 'comma separated layouts to run on [Default: depends on the benchmark]')
+    parser.add_option('-r', '--repeats', dest = 'repeats', type = 'int', default = 3,
+                      help = 'report the best of this many runs [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    import sys
+    options = readCommand(sys.argv[1:])
+    for name in options.benchmark.split(','):
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark ' + name)
+        function, defaultLayouts = BENCHMARKS[name]
+        layouts = options.layouts if options.layouts != None else defaultLayouts
+        print('=== %s ===' % name)
+        function(layouts.split(','), options.repeats)
@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+import collections
 
 
 class FixedRandom:
@@ -147,6 +148,9 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
@@ -156,6 +160,11 @@ class Queue:
         "Enqueue the 'item' into the queue"
         self.list.insert(0,item)
 
+    def extend(self, items):
+        "Enqueue every item of an iterable, in order"
+        for item in items:
+            self.push(item)
+
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
@@ -167,6 +176,41 @@ class Queue:
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
+class DequeQueue:
+    """
+      A container with a first-in-first-out (FIFO) queuing policy, backed by a
+      collections.deque.  It has the same interface as Queue, but push and pop
+      are O(1) instead of O(n), which matters for breadth first search on
+      large mazes.
+    """
+    def __init__(self):
+        self.list = collections.deque()
+
+    def push(self,item):
+        "Enqueue the 'item' into the queue"
+        self.list.append(item)
+
+    def extend(self, items):
+        "Enqueue every item of an iterable, in order, with a single call"
+        self.list.extend(items)
+
+    def pop(self):
+        """
+          Dequeue the earliest enqueued item still in the queue. This
+          operation removes the item from the queue.
+        """
+        return self.list.popleft()
+
+    def isEmpty(self):
+        "Returns true if the queue is empty"
+        return len(self.list) == 0
+
+    def __len__(self):
+        return len(self.list)
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -190,6 +234,9 @@ class PriorityQueue:
     def isEmpty(self):
         return len(self.heap) == 0
 
+    def __len__(self):
+        return len(self.heap)
+
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
@@ -205,6 +252,446 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      A drop-in replacement for PriorityQueue that keeps a map from each item
+      to its entry in the heap.  Membership tests are O(1) and update (the
+      decrease-key operation used by uniform cost and A* search) is O(log n)
+      instead of a linear scan followed by a full heapify.
+
+      Items must be hashable and are held at most once: pushing an item that
+      is already in the queue behaves like update.  Ties are broken in
+      insertion order, exactly as in PriorityQueue.
+
+      With lazy=True, update never moves entries around.  The old entry is
+      marked dead and a new one is pushed through heapq; pop skips dead
+      entries.  This mode only ever hashes items and leaves all heap work to
+      the C implementation of heapq, which is usually faster for items that
+      are cheap to hash but expensive to compare.
+    """
+    _REMOVED = object() # Marks an entry superseded by update in lazy mode
+
+    def  __init__(self, lazy=False):
+        self.heap = []
+        self.count = 0
+        self.lazy = lazy
+        self.entries = {} # item -> [priority, count, item]
+        if not lazy:
+            self.index = {} # item -> position of its entry in self.heap
+
+    def push(self, item, priority):
+        if item in self.entries:
+            self.update(item, priority)
+            return
+        entry = [priority, self.count, item]
+        self.count += 1
+        self.entries[item] = entry
+        if self.lazy:
+            heapq.heappush(self.heap, entry)
+        else:
+            self.heap.append(entry)
+            self.index[item] = len(self.heap) - 1
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        if self.lazy:
+            while True:
+                (_, _, item) = heapq.heappop(self.heap)
+                if item is not self._REMOVED:
+                    del self.entries[item]
+                    return item
+        last = self.heap.pop()
+        if not self.heap:
+            top = last
+        else:
+            top = self.heap[0]
+            self.heap[0] = last
+            self.index[last[2]] = 0
+            self._siftDown(0)
+        del self.index[top[2]]
+        del self.entries[top[2]]
+        return top[2]
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of an item
+        # already in the queue, ignore a priority that is not an improvement,
+        # and push items that are not in the queue yet.
+        entry = self.entries.get(item)
+        if entry is None:
+            self.push(item, priority)
+            return
+        if entry[0] <= priority:
+            return
+        if self.lazy:
+            # Keep the original tie-break count, as PriorityQueue.update does
+            newEntry = [priority, entry[1], item]
+            entry[2] = self._REMOVED
+            self.entries[item] = newEntry
+            heapq.heappush(self.heap, newEntry)
+        else:
+            entry[0] = priority
+            self._siftUp(self.index[item])
+
+    def getPriority(self, item):
+        "Returns the current priority of an item in the queue"
+        return self.entries[item][0]
+
+    def peekPriority(self):
+        "Returns the lowest priority in the queue, without popping its item"
+        if self.lazy:
+            while self.heap[0][2] is self._REMOVED:
+                heapq.heappop(self.heap)
+        return self.heap[0][0]
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def __iter__(self):
+        "Iterates over the items in the queue, in no particular order"
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getstate__(self):
+        # Dead entries are dropped, since a copy of _REMOVED would look live
+        state = dict(vars(self))
+        if self.lazy:
+            state['heap'] = [entry for entry in self.heap if entry[2] is not self._REMOVED]
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        if self.lazy:
+            heapq.heapify(self.heap)
+
+    def _siftUp(self, pos):
+        heap, index = self.heap, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parentPos = (pos - 1) >> 1
+            parent = heap[parentPos]
+            if not entry < parent:
+                break
+            heap[pos] = parent
+            index[parent[2]] = pos
+            pos = parentPos
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+    def _siftDown(self, pos):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[pos]
+        childPos = 2 * pos + 1
+        while childPos < size:
+            rightPos = childPos + 1
+            if rightPos < size and heap[rightPos] < heap[childPos]:
+                childPos = rightPos
+            child = heap[childPos]
+            if not child < entry:
+                break
+            heap[pos] = child
+            index[child[2]] = pos
+            pos = childPos
+            childPos = 2 * pos + 1
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+class BucketQueue:
+    """
+      A monotone bucket queue (Dial's algorithm) for integer priorities, with
+      the interface of IndexedPriorityQueue.  Items are kept in one bucket
+      per priority, and pop scans upwards from the lowest priority popped so
+      far, so push and update are O(1) apart from a small heap inside each
+      bucket, which pops ties in insertion order as PriorityQueue does.  As
+      in the lazy mode of IndexedPriorityQueue, update leaves the old entry
+      in its bucket marked dead, and pop skips dead entries.
+
+      Integral floats such as 3.0 are accepted.  push and update raise
+      ValueError for a priority that is not an integer, or that is more than
+      maxSpan above the lowest priority in the queue, where the buckets would
+      be too sparse to beat a heap; the caller can then move to a RadixHeap
+      with toRadixHeap, or to an IndexedPriorityQueue with
+      toIndexedPriorityQueue.  Priorities below the lowest popped so far are
+      allowed, but move the scan back down.
+    """
+    _REMOVED = object() # Marks an entry superseded by update
+
+    def  __init__(self, maxSpan=4096):
+        self.maxSpan = maxSpan
+        self.buckets = {}   # priority -> heap of [priority, count, item] entries, with dead ones
+        self.entries = {}   # item -> its live entry
+        self.cursor = None  # no bucket below this one holds a live item
+        self.count = 0
+
+    def push(self, item, priority):
+        entries = self.entries
+        if item in entries:
+            self.update(item, priority)
+            return
+        if type(priority) is not int or (entries and priority - self.cursor > self.maxSpan):
+            priority = self._key(priority)
+        if not entries:
+            self.buckets = {} # Only dead entries are left
+            self.cursor = priority
+        entry = [priority, self.count, item]
+        self.count += 1
+        entries[item] = entry
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [entry]
+        else:
+            heapq.heappush(bucket, entry)
+        if priority < self.cursor:
+            self.cursor = priority
+
+    def _key(self, priority):
+        try:
+            key = int(priority)
+        except OverflowError: # Infinity
+            key = None
+        if key != priority:
+            raise ValueError('Priority %r is not an integer' % (priority,))
+        if self.entries and key - self.cursor > self.maxSpan:
+            raise ValueError('Priority %r is too far above the lowest in the queue' % (priority,))
+        return key
+
+    def _advance(self):
+        "Moves the cursor to the bucket of the live item that pops next, and returns the bucket."
+        buckets, removed = self.buckets, self._REMOVED
+        while True:
+            bucket = buckets.get(self.cursor)
+            while bucket:
+                if bucket[0][2] is not removed:
+                    return bucket
+                heapq.heappop(bucket)
+            if bucket is not None:
+                del buckets[self.cursor]
+            if self.cursor + 1 in buckets:
+                self.cursor += 1
+            else:
+                self.cursor = min(buckets) # Skips the empty buckets in a gap
+
+    def pop(self):
+        if not self.entries:
+            raise IndexError('pop from an empty BucketQueue')
+        # _advance inlined, since pop is the hot path
+        buckets, removed = self.buckets, self._REMOVED
+        while True:
+            bucket = buckets.get(self.cursor)
+            while bucket:
+                item = heapq.heappop(bucket)[2]
+                if item is not removed:
+                    del self.entries[item]
+                    return item
+            if bucket is not None:
+                del buckets[self.cursor]
+            if self.cursor + 1 in buckets:
+                self.cursor += 1
+            else:
+                self.cursor = min(buckets) # Skips the empty buckets in a gap
+
+    def peekPriority(self):
+        "Returns the lowest priority in the queue, without popping its item"
+        if not self.entries:
+            raise IndexError('peek into an empty BucketQueue')
+        self._advance()
+        return self.cursor
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update
+        entries = self.entries
+        entry = entries.get(item)
+        if entry is None:
+            self.push(item, priority)
+            return
+        if entry[0] <= priority:
+            return
+        if type(priority) is not int:
+            priority = self._key(priority)
+        entry[2] = self._REMOVED
+        entry = entries[item] = [priority, entry[1], item] # The tie-break count is kept
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [entry]
+        else:
+            heapq.heappush(bucket, entry)
+        if priority < self.cursor:
+            self.cursor = priority
+
+    def getPriority(self, item):
+        "Returns the current priority of an item in the queue"
+        return self.entries[item][0]
+
+    def toIndexedPriorityQueue(self):
+        "Returns an IndexedPriorityQueue that pops the same items in the same order."
+        return _queueInOrder(self.entries, IndexedPriorityQueue(lazy=True))
+
+    def __getstate__(self):
+        # Dead entries are dropped, since a copy of _REMOVED would look live
+        state = dict(vars(self))
+        state['buckets'] = dict((key, [entry for entry in bucket if entry[2] is not self._REMOVED])
+                                for key, bucket in self.buckets.items())
+        return state
+
+    def __setstate__(self, state):
+        vars(self).update(state)
+        for key in [key for key, bucket in self.buckets.items() if not bucket]:
+            del self.buckets[key]
+        for bucket in self.buckets.values():
+            heapq.heapify(bucket)
+
+    def toRadixHeap(self):
+        """
+          Returns a RadixHeap that pops the same items in the same order, and
+          accepts any integer priority from the last one popped upwards.
+        """
+        heap = RadixHeap()
+        if self.entries:
+            heap.last = self.cursor # Not above any priority in the queue
+        return _queueInOrder(self.entries, heap)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def __iter__(self):
+        "Iterates over the items in the queue, in no particular order"
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+class RadixHeap:
+    """
+      A radix heap for monotone integer priorities, with the interface of
+      IndexedPriorityQueue.  An item with priority p sits in bucket number
+      (p ^ last).bit_length(), where last is the priority popped last; pop
+      empties the lowest non-empty bucket into lower ones, so each item is
+      moved at most once per bit of the priority range and comparisons are
+      on small ints only.  Ties pop in insertion order.
+
+      Priorities must be integral and no lower than the last one popped, as
+      with uniform cost search or A* with a consistent heuristic; push and
+      update raise ValueError otherwise, and the caller can then move to an
+      IndexedPriorityQueue with toIndexedPriorityQueue.
+    """
+    def  __init__(self):
+        self.last = 0
+        self.current = []                   # heap of (count, item) with priority last
+        self.buckets = [[] for i in range(65)] # (priority, count, item), unsorted
+        self.entries = {}                   # item -> [priority, count]
+        self.count = 0
+
+    def _place(self, key, count, item):
+        if key == self.last:
+            heapq.heappush(self.current, (count, item))
+        else:
+            bucket = (key ^ self.last).bit_length()
+            if bucket >= len(self.buckets):
+                self.buckets.extend([] for i in range(bucket + 1 - len(self.buckets)))
+            self.buckets[bucket].append((key, count, item))
+
+    def _key(self, priority):
+        try:
+            key = int(priority)
+        except OverflowError: # Infinity
+            key = None
+        if key != priority:
+            raise ValueError('Priority %r is not an integer' % (priority,))
+        if key < self.last:
+            raise ValueError('Priority %r is below the last popped priority %r' % (priority, self.last))
+        return key
+
+    def push(self, item, priority):
+        if item in self.entries:
+            self.update(item, priority)
+            return
+        key = self._key(priority)
+        self.entries[item] = [key, self.count]
+        self._place(key, self.count, item)
+        self.count += 1
+
+    def _refill(self):
+        "Makes sure self.current holds the live items with the lowest priority."
+        entries = self.entries
+        current = self.current
+        while current:
+            count, item = current[0]
+            entry = entries.get(item)
+            if entry is not None and entry[0] == self.last and entry[1] == count:
+                return
+            heapq.heappop(current)
+        for bucket in self.buckets[1:]:
+            live = [(key, count, item) for key, count, item in bucket
+                    if item in entries and entries[item][0] == key and entries[item][1] == count]
+            del bucket[:]
+            if live:
+                self.last = min(live)[0]
+                for key, count, item in live:
+                    self._place(key, count, item)
+                return
+
+    def pop(self):
+        if not self.entries:
+            raise IndexError('pop from an empty RadixHeap')
+        self._refill()
+        count, item = heapq.heappop(self.current)
+        del self.entries[item]
+        return item
+
+    def peekPriority(self):
+        "Returns the lowest priority in the queue, without popping its item"
+        if not self.entries:
+            raise IndexError('peek into an empty RadixHeap')
+        self._refill()
+        return self.last
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update
+        entry = self.entries.get(item)
+        if entry is None:
+            self.push(item, priority)
+            return
+        if entry[0] <= priority:
+            return
+        key = self._key(priority)
+        entry[0] = key
+        self._place(key, entry[1], item) # Keeps the tie-break count
+
+    def getPriority(self, item):
+        "Returns the current priority of an item in the queue"
+        return self.entries[item][0]
+
+    def toIndexedPriorityQueue(self):
+        "Returns an IndexedPriorityQueue that pops the same items in the same order."
+        return _queueInOrder(self.entries, IndexedPriorityQueue(lazy=True))
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def __iter__(self):
+        "Iterates over the items in the queue, in no particular order"
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+def _queueInOrder(entries, queue):
+    "Pushes the items of an item -> [priority, count, ...] map onto an empty queue, ties kept in count order."
+    for item, entry in sorted(entries.items(), key=lambda pair: pair[1][:2]):
+        queue.push(item, entry[0])
+    return queue
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the